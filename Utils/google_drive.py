@@ -8,16 +8,31 @@ particularly for handling Excel files and tracking article publications.
 
 import os
 import io
-from typing import Dict, Any, Tuple, List, Optional, cast
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Dict, Any, Tuple, List, Optional, Union, cast
 
 import pandas as pd
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.http import MediaIoBaseUpload
 from google.oauth2 import service_account
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaIoBaseDownload
+import google_auth_httplib2
+import httplib2
+from openpyxl import Workbook
 
 from core.credentials import google, global_cfg, users
 
+# python-calamine (Rust) parses xlsx several times faster than openpyxl's
+# DOM reader; fall back to pandas' default engine when it isn't installed.
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_READ_ENGINE: Optional[str] = "calamine"
+except ImportError:
+    EXCEL_READ_ENGINE = None
+
 # Get credentials and configuration
 gcreds = google()
 global_cfg = global_cfg()
@@ -43,7 +58,59 @@ drive_creds = service_account.Credentials.from_service_account_file(
     SERVICE_ACCOUNT_FILE,
     scopes=DRIVE_SCOPES,
 )
-drive = build("drive", "v3", credentials=drive_creds)
+
+# google-api-python-client ships the Drive v3 discovery document. It is
+# parsed once here and every client (this one and the per-thread ones) is
+# built from the parsed copy, so no build() re-reads or re-fetches it. The
+# first build normalises the dict in place, which keeps later builds from
+# worker threads read-only.
+try:
+    from googleapiclient.discovery_cache import get_static_doc
+    _static_doc = get_static_doc("drive", "v3")
+    DRIVE_DISCOVERY: Optional[Dict[str, Any]] = json.loads(_static_doc) if _static_doc else None
+except ImportError:  # pragma: no cover – client < 2.0 has no bundled documents
+    DRIVE_DISCOVERY = None
+
+def _build_drive(**kwargs):
+    if DRIVE_DISCOVERY is not None:
+        return build_from_document(DRIVE_DISCOVERY, **kwargs)
+    return build("drive", "v3", **kwargs)
+
+drive = _build_drive(credentials=drive_creds)
+
+# googleapiclient service objects share a single httplib2.Http, which is not
+# thread-safe, so worker threads get a client of their own.
+_thread_local = threading.local()
+DRIVE_WORKERS = 8
+HTTP_TIMEOUT_SEC = 60
+
+def _thread_drive():
+    """Return a Drive client that is safe to use from the calling thread."""
+    if threading.current_thread() is threading.main_thread():
+        return drive
+    client = getattr(_thread_local, "drive", None)
+    if client is None:
+        http = google_auth_httplib2.AuthorizedHttp(drive_creds, http=httplib2.Http(timeout=HTTP_TIMEOUT_SEC))
+        client = _build_drive(http=http)
+        _thread_local.drive = client
+    return client
+
+# Long-lived pool for parallel Drive downloads. Its threads – and therefore
+# their Drive clients and open TLS connections – survive between calls, so
+# only the first prefetch of a process pays for client construction.
+_drive_pool: Optional[ThreadPoolExecutor] = None
+_drive_pool_lock = threading.Lock()
+
+def _get_drive_pool() -> ThreadPoolExecutor:
+    global _drive_pool
+    with _drive_pool_lock:
+        if _drive_pool is None:
+            _drive_pool = ThreadPoolExecutor(
+                max_workers=DRIVE_WORKERS,
+                thread_name_prefix="drive",
+                initializer=_thread_drive,
+            )
+        return _drive_pool
 
 # ---------- Excel Configuration ----------
 EXCEL_PATH: str = os.path.join(DATABASE, EXCEL_NAME)
@@ -62,67 +129,223 @@ SOCIAL_POSTS_COLUMNS = [
     "id", "employee_name", "platform", "article_id", "posted", "post_date", "post_url"
 ]
 
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+def write_workbook(target: Union[str, IO[bytes]], sheets: Dict[str, Any]) -> None:
+    """Write every DataFrame in *sheets* to *target* (a path or binary buffer)
+    with openpyxl's streaming (write-only) mode.
+
+    Rows are appended straight to the sheet XML instead of building the
+    full cell DOM that ``pd.ExcelWriter`` creates. Missing values are
+    written as empty cells, as ``DataFrame.to_excel`` does. Non-DataFrame
+    entries such as ``'file_id'`` are skipped.
+    """
+    wb = Workbook(write_only=True)
+    for sheet_name, df in sheets.items():
+        if not isinstance(df, pd.DataFrame):
+            continue
+        ws = wb.create_sheet(title=sheet_name)
+        ws.append([str(c) for c in df.columns])
+        # object dtype turns numpy scalars into plain Python values openpyxl accepts
+        values = df.astype(object).where(df.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            ws.append(row)
+    wb.save(target)
+
+def workbook_media(sheets: Dict[str, Any]) -> MediaIoBaseUpload:
+    """Serialise *sheets* into memory and wrap them for a Drive upload.
+
+    The workbook never touches EXCEL_PATH. While it is a few KB a single
+    multipart request beats a resumable session's extra round-trip; past
+    SMALL_FILE_BYTES it goes up resumably in chunks, which ``execute()``
+    drives itself.
+    """
+    buf = io.BytesIO()
+    write_workbook(buf, sheets)
+    resumable = buf.tell() >= SMALL_FILE_BYTES
+    buf.seek(0)
+    return MediaIoBaseUpload(buf, mimetype=XLSX_MIMETYPE, resumable=resumable, chunksize=DOWNLOAD_CHUNK_BYTES)
+
+# True/False flag columns. An xlsx round-trip often leaves them as object
+# columns (mixed bool / str / NaN), which makes ``== False`` fall back to a
+# per-element Python comparison.
+FLAG_COLUMNS = ("posted_medium", "posted")
+_FLAG_VALUES = {"true": True, "1": True, "1.0": True, "false": False, "0": False, "0.0": False}
+
+def normalise_flag_columns(excel_data: Dict[str, Any]) -> None:
+    """Convert every FLAG_COLUMNS column in *excel_data* to pandas' nullable
+    ``boolean`` dtype in place; blanks and unrecognised values become <NA>."""
+    for df in excel_data.values():
+        if not isinstance(df, pd.DataFrame):
+            continue
+        for col in FLAG_COLUMNS:
+            if col not in df.columns or df[col].dtype == "boolean":
+                continue
+            if df[col].dtype == bool:
+                df[col] = df[col].astype("boolean")
+            else:
+                text = df[col].astype("string").str.strip().str.lower()
+                df[col] = text.map(_FLAG_VALUES).astype("boolean")
+
+def flag_is(column: pd.Series, value: bool) -> pd.Series:
+    """Vectorised ``column == value`` for a flag column; <NA> never matches."""
+    return column.astype("boolean").eq(value).fillna(False).astype(bool)
+
+def find_first(client, query: str, fields: str = "id") -> Optional[Dict[str, Any]]:
+    """
+    Return the first file matching *query* (with only *fields*), or None.
+
+    Callers only ever use the first hit, so a single row is requested.
+    Drive may hand back an empty page together with a nextPageToken, in
+    which case the next page is fetched.
+    """
+    page_token = None
+    while True:
+        result = client.files().list(
+            q=query, pageSize=1, fields=f"nextPageToken, files({fields})",
+            pageToken=page_token, **LIST_KWARGS,
+        ).execute()
+        files = result.get("files", [])
+        if files:
+            return files[0]
+        page_token = result.get("nextPageToken")
+        if not page_token:
+            return None
+
+# The tracking Excel's Drive id practically never changes, so it is kept
+# next to the local workbook and the lookup `list` call is skipped on later
+# runs. The folder and name are stored too, so a config change invalidates
+# it; set REFRESH_EXCEL_ID=1 to force a fresh lookup after replacing the
+# file on Drive by hand.
+EXCEL_ID_CACHE: str = EXCEL_PATH + ".drive_id.json"
+_excel_file_id: Optional[str] = None
+
+def cached_excel_file_id() -> Optional[str]:
+    """Return the remembered tracking-Excel id, or None."""
+    global _excel_file_id
+    if _excel_file_id is None:
+        try:
+            with open(EXCEL_ID_CACHE, "r", encoding="utf-8") as fp:
+                entry = json.load(fp)
+        except (OSError, ValueError):
+            return None
+        if entry.get("folder_id") == FOLDER_ID and entry.get("name") == EXCEL_NAME:
+            _excel_file_id = entry.get("id") or None
+    return _excel_file_id
+
+def remember_excel_file_id(file_id: str) -> None:
+    global _excel_file_id
+    _excel_file_id = file_id
+    try:
+        with open(EXCEL_ID_CACHE, "w", encoding="utf-8") as fp:
+            json.dump({"folder_id": FOLDER_ID, "name": EXCEL_NAME, "id": file_id}, fp)
+    except OSError as e:
+        print(f"[WARN] Could not persist Excel file id: {e}")
+
+def forget_excel_file_id() -> None:
+    global _excel_file_id
+    _excel_file_id = None
+    try:
+        os.remove(EXCEL_ID_CACHE)
+    except FileNotFoundError:
+        pass
+
+if os.getenv("REFRESH_EXCEL_ID"):
+    forget_excel_file_id()
+
 def ensure_excel_on_drive() -> str:
     """Return file id of tracking Excel, creating it if missing."""
+    cached = cached_excel_file_id()
+    if cached:
+        return cached
+
     query = f"name = '{EXCEL_NAME}' and '{FOLDER_ID}' in parents"
-    res = drive.files().list(q=query, fields="files(id,name)", **LIST_KWARGS).execute()
-    files = res.get("files", [])
-    if files:
-        return files[0]["id"]
+    found = find_first(drive, query)
+    if found:
+        remember_excel_file_id(found["id"])
+        return found["id"]
 
     # Create a new Excel file with all three sheets
-    with pd.ExcelWriter(EXCEL_PATH, engine='openpyxl') as writer:
-        # Create articles sheet
-        df_articles = pd.DataFrame()
-        for col in ARTICLES_COLUMNS:
-            df_articles[col] = pd.Series(dtype=object)
-        df_articles.to_excel(writer, sheet_name='articles', index=False)
-        
-        # Create social_accounts sheet
-        df_social_accounts = pd.DataFrame({
-            "id": pd.Series(dtype=int),
-            "employee_name": pd.Series(dtype=str),
-            "platform": pd.Series(dtype=str),
-        })
-        
-        # Pre-populate social accounts from credentials
-        account_id = 1
-        all_users = users()
-        for user_id, user_data in all_users.items():
-            # Add Twitter accounts
-            if 'twitter' in user_data:
-                screen_name = user_data.get('twitter', {}).get('screen_name', '')
-                if screen_name:
-                    new_row = pd.DataFrame([{
-                        "id": account_id,
-                        "employee_name": user_id,
-                        "platform": "twitter",
-                    }])
-                    df_social_accounts = pd.concat([df_social_accounts, new_row], ignore_index=True)
-                    account_id += 1
-            
-            # Add LinkedIn accounts
-            if 'linkedin' in user_data:
+    # Create articles sheet
+    df_articles = pd.DataFrame()
+    for col in ARTICLES_COLUMNS:
+        df_articles[col] = pd.Series(dtype=object)
+    
+    # Create social_accounts sheet
+    df_social_accounts = pd.DataFrame({
+        "id": pd.Series(dtype=int),
+        "employee_name": pd.Series(dtype=str),
+        "platform": pd.Series(dtype=str),
+    })
+    
+    # Pre-populate social accounts from credentials
+    account_id = 1
+    all_users = users()
+    for user_id, user_data in all_users.items():
+        # Add Twitter accounts
+        if 'twitter' in user_data:
+            screen_name = user_data.get('twitter', {}).get('screen_name', '')
+            if screen_name:
                 new_row = pd.DataFrame([{
                     "id": account_id,
                     "employee_name": user_id,
-                    "platform": "linkedin",
+                    "platform": "twitter",
                 }])
                 df_social_accounts = pd.concat([df_social_accounts, new_row], ignore_index=True)
                 account_id += 1
-                
-        df_social_accounts.to_excel(writer, sheet_name='social_accounts', index=False)
         
-        # Create social_posts sheet with correct structure
-        df_social = pd.DataFrame({col: pd.Series(dtype=object) for col in SOCIAL_POSTS_COLUMNS})
-        df_social.to_excel(writer, sheet_name='social_posts', index=False)
+        # Add LinkedIn accounts
+        if 'linkedin' in user_data:
+            new_row = pd.DataFrame([{
+                "id": account_id,
+                "employee_name": user_id,
+                "platform": "linkedin",
+            }])
+            df_social_accounts = pd.concat([df_social_accounts, new_row], ignore_index=True)
+            account_id += 1
+
+    # Create social_posts sheet with correct structure
+    df_social = pd.DataFrame({col: pd.Series(dtype=object) for col in SOCIAL_POSTS_COLUMNS})
 
-    media = MediaFileUpload(EXCEL_PATH, mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    media = workbook_media({
+        'articles': df_articles,
+        'social_accounts': df_social_accounts,
+        'social_posts': df_social,
+    })
     meta = {"name": EXCEL_NAME, "parents": [FOLDER_ID]}
     file = drive.files().create(body=meta, media_body=media, fields="id", **DRIVE_KWARGS).execute()
     print(f"[INFO] Created tracking Excel on Drive (id={file['id']}) with articles, social_accounts, and social_posts sheets")
+    remember_excel_file_id(file["id"])
     return file["id"]
 
+# Parsed workbook keyed by Drive's md5Checksum. A metadata GET is far
+# cheaper than downloading and re-parsing the xlsx when nothing changed.
+# Callers mutate the sheets in place, so only copies are handed out.
+_excel_cache: Dict[str, Any] = {}
+_excel_cache_lock = threading.Lock()
+
+def _copy_workbook(excel_data: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v.copy() if isinstance(v, pd.DataFrame) else v for k, v in excel_data.items()}
+
+def invalidate_excel_cache() -> None:
+    """Forget the cached workbook so the next download re-reads Drive."""
+    with _excel_cache_lock:
+        _excel_cache.clear()
+
+def _excel_checksum() -> Tuple[str, Optional[str]]:
+    """Return ``(file_id, md5Checksum)`` of the tracking Excel – metadata only."""
+    file_id = ensure_excel_on_drive()
+    try:
+        meta = drive.files().get(fileId=file_id, fields="md5Checksum", **DRIVE_KWARGS).execute()
+    except HttpError as e:
+        if e.resp.status != 404:
+            raise
+        # Remembered id went stale (file deleted / replaced) – look it up again
+        forget_excel_file_id()
+        file_id = ensure_excel_on_drive()
+        meta = drive.files().get(fileId=file_id, fields="md5Checksum", **DRIVE_KWARGS).execute()
+    return file_id, meta.get("md5Checksum")
+
 def download_excel_from_drive() -> Dict[str, pd.DataFrame]:
     """
     Downloads the tracking Excel file from Google Drive.
@@ -130,14 +353,15 @@ def download_excel_from_drive() -> Dict[str, pd.DataFrame]:
     Returns:
         Dict with DataFrames for each sheet and the file ID as 'file_id'
     """
-    file_id = ensure_excel_on_drive()
-    request = drive.files().get_media(fileId=file_id)
-    fh = io.BytesIO()
-    downloader = MediaIoBaseDownload(fh, request)
-    done = False
-    while not done:
-        status, done = downloader.next_chunk()
-    fh.seek(0)
+    return _load_excel(*_excel_checksum())
+
+def _load_excel(file_id: str, checksum: Optional[str]) -> Dict[str, Any]:
+    with _excel_cache_lock:
+        if checksum and _excel_cache.get("file_id") == file_id and _excel_cache.get("md5") == checksum:
+            return _copy_workbook(_excel_cache["data"])
+
+    # The workbook is a few KB: one GET instead of 100 KiB next_chunk() calls
+    fh = io.BytesIO(get_media_bytes(drive, file_id))
     
     # Read all sheets
     result: Dict[str, Any] = {
@@ -145,21 +369,26 @@ def download_excel_from_drive() -> Dict[str, pd.DataFrame]:
     }
     
     try:
-        # Try to read all sheets in the new format
-        xl = pd.ExcelFile(fh)
-        sheet_names = xl.sheet_names
-        
-        if 'articles' in sheet_names:
-            result['articles'] = pd.read_excel(fh, sheet_name='articles', dtype={'medium_url': str})
-        
-        if 'social_accounts' in sheet_names:
-            result['social_accounts'] = pd.read_excel(fh, sheet_name='social_accounts')
-        
-        if 'social_posts' in sheet_names:
-            result['social_posts'] = pd.read_excel(fh, sheet_name='social_posts', dtype={'post_url': str})
+        # Try to read all sheets in the new format. The workbook is opened
+        # once and each sheet parsed from it, rather than re-opened per sheet.
+        with pd.ExcelFile(fh, engine=EXCEL_READ_ENGINE) as xl:
+            sheet_names = xl.sheet_names
+
+            if 'articles' in sheet_names:
+                result['articles'] = xl.parse('articles', dtype={'medium_url': str})
+
+            if 'social_accounts' in sheet_names:
+                result['social_accounts'] = xl.parse('social_accounts')
+
+            if 'social_posts' in sheet_names:
+                result['social_posts'] = xl.parse('social_posts', dtype={'post_url': str})
             
         # Check if we got at least the articles sheet in the new format
         if 'articles' in result:
+            normalise_flag_columns(result)
+            if checksum:
+                with _excel_cache_lock:
+                    _excel_cache.update(file_id=file_id, md5=checksum, data=_copy_workbook(result))
             return result
             
         # If we get here, it means the Excel exists but not with the expected sheet names
@@ -176,7 +405,7 @@ def download_excel_from_drive() -> Dict[str, pd.DataFrame]:
         "id": pd.Series(dtype="int"),
         "filename": pd.Series(dtype="str"),
         "date": pd.Series(dtype="str"),
-        "posted_medium": pd.Series(dtype="bool"),
+        "posted_medium": pd.Series(dtype="boolean"),
         "keyword": pd.Series(dtype="str"),
         "medium_url": pd.Series(dtype="str")
     })
@@ -216,14 +445,15 @@ def download_excel_from_drive() -> Dict[str, pd.DataFrame]:
     social_posts_df = pd.DataFrame({col: pd.Series(dtype="object") for col in SOCIAL_POSTS_COLUMNS})
     
     # Save all sheets
-    with pd.ExcelWriter(EXCEL_PATH, engine='openpyxl') as writer:
-        articles_df.to_excel(writer, sheet_name='articles', index=False)
-        social_accounts_df.to_excel(writer, sheet_name='social_accounts', index=False)
-        social_posts_df.to_excel(writer, sheet_name='social_posts', index=False)
+    media = workbook_media({
+        'articles': articles_df,
+        'social_accounts': social_accounts_df,
+        'social_posts': social_posts_df,
+    })
     
     # Upload the new file
-    media = MediaFileUpload(EXCEL_PATH, mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
     drive.files().update(fileId=file_id, media_body=media, **DRIVE_KWARGS).execute()
+    invalidate_excel_cache()
     
     # Return the new dataframes
     result = {
@@ -272,14 +502,15 @@ def update_medium_article(filename: str, updates: dict) -> int:
     
     
     # Save the updated Excel file
-    with pd.ExcelWriter(EXCEL_PATH, engine='openpyxl') as writer:
-        articles_df.to_excel(writer, sheet_name='articles', index=False)
-        social_accounts_df.to_excel(writer, sheet_name='social_accounts', index=False)
-        social_posts_df.to_excel(writer, sheet_name='social_posts', index=False)
+    media = workbook_media({
+        'articles': articles_df,
+        'social_accounts': social_accounts_df,
+        'social_posts': social_posts_df,
+    })
     
     # Upload to Drive
-    media = MediaFileUpload(EXCEL_PATH, mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
     drive.files().update(fileId=file_id, media_body=media, **DRIVE_KWARGS).execute()
+    invalidate_excel_cache()
     
     return article_id
 
@@ -313,21 +544,12 @@ def update_social_post(employee_name: str, platform: str, article_id: int, updat
     for key, value in updates.items():
         social_posts_df.loc[match, key] = value
     
-    # Save ALL sheets while injecting the updated social_posts
-    with pd.ExcelWriter(EXCEL_PATH, engine='openpyxl') as writer:
-        for sheet_name, df in excel_data.items():
-            if sheet_name == 'social_posts':
-                social_posts_df.to_excel(writer, sheet_name='social_posts', index=False)
-            elif sheet_name == 'articles':
-                articles_df.to_excel(writer, sheet_name='articles', index=False)
-            else:
-                # Preserve any additional sheets (e.g. social_accounts)
-                if isinstance(df, pd.DataFrame):
-                    df.to_excel(writer, sheet_name=sheet_name, index=False)
-    
+    # Save ALL sheets (social_posts was updated in place)
+    media = workbook_media(excel_data)
+
     # Upload the updated file
-    media = MediaFileUpload(EXCEL_PATH, mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
     drive.files().update(fileId=file_id, media_body=media, **DRIVE_KWARGS).execute()
+    invalidate_excel_cache()
 
 def add_new_article_entry(filename: str, keyword: str = "") -> int:
     """
@@ -365,18 +587,57 @@ def add_new_article_entry(filename: str, keyword: str = "") -> int:
     articles_df = pd.concat([articles_df, pd.DataFrame([new_article])], ignore_index=True)
     
     # Save all sheets
-    with pd.ExcelWriter(EXCEL_PATH, engine='openpyxl') as writer:
-        articles_df.to_excel(writer, sheet_name='articles', index=False)
-        social_accounts_df.to_excel(writer, sheet_name='social_accounts', index=False)
-        social_posts_df.to_excel(writer, sheet_name='social_posts', index=False)
+    media = workbook_media({
+        'articles': articles_df,
+        'social_accounts': social_accounts_df,
+        'social_posts': social_posts_df,
+    })
     
     # Upload the updated file
-    media = MediaFileUpload(EXCEL_PATH, mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
     drive.files().update(fileId=file_id, media_body=media, **DRIVE_KWARGS).execute()
+    invalidate_excel_cache()
     
     return new_id
 
-def get_unpublished_filenames(platform: str | None = None, employee_name: Optional[str] = None) -> List[Dict[str, Any]]:
+# md5Checksum of the workbook at which a (platform, employee) query last came
+# back empty, persisted across runs so an idle scheduled run only costs a
+# metadata GET. Kept next to the local workbook like EXCEL_ID_CACHE.
+NOTHING_PENDING_FILE: str = EXCEL_PATH + ".nothing_pending.json"
+
+def _nothing_pending_key(platform: Optional[str], employee_name: Optional[str]) -> str:
+    return f"{platform or '*'}|{employee_name or '*'}"
+
+def _load_nothing_pending() -> Dict[str, str]:
+    try:
+        with open(NOTHING_PENDING_FILE, "r", encoding="utf-8") as fp:
+            return json.load(fp)
+    except (OSError, ValueError):
+        return {}
+
+def _nothing_pending_at(platform: Optional[str], employee_name: Optional[str]) -> Optional[str]:
+    return _load_nothing_pending().get(_nothing_pending_key(platform, employee_name))
+
+def _record_nothing_pending(platform: Optional[str], employee_name: Optional[str],
+                            checksum: Optional[str]) -> None:
+    """Remember *checksum* for this query, or forget it when None."""
+    state = _load_nothing_pending()
+    key = _nothing_pending_key(platform, employee_name)
+    if state.get(key) == checksum:
+        return
+    if checksum:
+        state[key] = checksum
+    elif key not in state:
+        return
+    else:
+        del state[key]
+    try:
+        with open(NOTHING_PENDING_FILE, "w", encoding="utf-8") as fp:
+            json.dump(state, fp)
+    except OSError as e:
+        print(f"[WARN] Could not persist publishing state: {e}")
+
+def get_unpublished_filenames(platform: str | None = None, employee_name: Optional[str] = None,
+                              excel_data: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
     """
     Return social-post tasks that are still *unposted* (posted == False).
 
@@ -386,13 +647,23 @@ def get_unpublished_filenames(platform: str | None = None, employee_name: Option
         medium_url   – Medium URL of the article
         employee_name – Target employee
         platform      – Target platform
+
+    Pass *excel_data* to reuse a workbook the caller already downloaded.
+    Without it, a workbook that has not changed since the last call found
+    nothing pending for the same *platform* / *employee_name* is not
+    downloaded at all.
     """
-    excel_data = download_excel_from_drive()
+    checksum = None
+    if excel_data is None:
+        file_id, checksum = _excel_checksum()
+        if checksum and _nothing_pending_at(platform, employee_name) == checksum:
+            return []
+        excel_data = _load_excel(file_id, checksum)
     articles_df = cast(pd.DataFrame, excel_data["articles"])
     social_posts_df = cast(pd.DataFrame, excel_data["social_posts"])
 
     # Filter posts that are not yet posted
-    pending_posts: pd.DataFrame = pd.DataFrame(social_posts_df[social_posts_df["posted"] == False])
+    pending_posts: pd.DataFrame = pd.DataFrame(social_posts_df[flag_is(social_posts_df["posted"], False)])
 
     # Apply platform / employee filters if provided
     if platform:
@@ -401,25 +672,20 @@ def get_unpublished_filenames(platform: str | None = None, employee_name: Option
         pending_posts = pending_posts[pending_posts["employee_name"] == employee_name] # type: ignore
 
     if pending_posts.empty:
+        _record_nothing_pending(platform, employee_name, checksum)
         return []
 
     # Need filename & medium_url – join with articles_df (only those already on Medium)
     articles_subset: pd.DataFrame = pd.DataFrame(articles_df[["id", "filename", "medium_url", "posted_medium"]])  # type: ignore[arg-type]
-    articles_subset = articles_subset[(articles_subset["posted_medium"] == True) & (articles_subset["medium_url"].notna()) & (articles_subset["medium_url"] != "")] # type: ignore[assignment]
+    articles_subset = articles_subset[flag_is(articles_subset["posted_medium"], True) & (articles_subset["medium_url"].notna()) & (articles_subset["medium_url"] != "")] # type: ignore[assignment]
 
     merged: pd.DataFrame = pending_posts.merge(articles_subset, left_on="article_id", right_on="id", how="inner", suffixes=("_post", "_article"))
+    _record_nothing_pending(platform, employee_name, checksum if merged.empty else None)
 
-    results: List[Dict[str, Any]] = []
-    for _, row in merged.iterrows():
-        results.append({
-            "article_id": int(row["article_id"]),
-            "filename": row["filename"],
-            "medium_url": row["medium_url"],
-            "employee_name": row["employee_name"],
-            "platform": row["platform"],
-        })
-
-    return results
+    # Build the result dicts column-wise instead of boxing a Series per row
+    records = pd.DataFrame(merged[["article_id", "filename", "medium_url", "employee_name", "platform"]])
+    records["article_id"] = records["article_id"].astype(int)
+    return cast(List[Dict[str, Any]], records.to_dict("records"))
 
 def get_article_id_by_filename(filename: str) -> Optional[int]:
     """Get the article ID for a given filename"""
@@ -492,22 +758,63 @@ def create_social_post_entries(article_id: int, medium_url: str) -> int:
         new_posts_df = pd.DataFrame(new_posts)
         social_posts_df = pd.concat([social_posts_df, new_posts_df], ignore_index=True)
     
-    # Save and upload
-    with pd.ExcelWriter(EXCEL_PATH, engine='openpyxl') as writer:
-        # Write all sheets
-        for sheet_name, df in excel_data.items():
-            if sheet_name != 'social_posts' and sheet_name != 'file_id':
-                if isinstance(df, pd.DataFrame):
-                    df.to_excel(writer, sheet_name=sheet_name, index=False)
-        
-        # Write the updated social_posts sheet
-        social_posts_df.to_excel(writer, sheet_name='social_posts', index=False)
-    
-    media = MediaFileUpload(EXCEL_PATH, mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    # Save and upload with the updated social_posts sheet
+    excel_data['social_posts'] = social_posts_df
+    media = workbook_media(excel_data)
     drive.files().update(fileId=file_id, media_body=media, **DRIVE_KWARGS).execute()
+    invalidate_excel_cache()
     
     return len(new_posts)
 
+# Drafts and the tracking workbook are a few KB, so they are fetched with a
+# single GET; anything larger streams in 8 MB chunks.
+SMALL_FILE_BYTES = 5 * 1024 * 1024
+DOWNLOAD_CHUNK_BYTES = 8 * 1024 * 1024
+
+
+def get_media_bytes(client, file_id: str, small: bool = True) -> bytes:
+    """
+    Return the content of Drive file *file_id*.
+
+    Args:
+        client: Drive service to use (``drive`` or ``_thread_drive()``)
+        file_id: ID of the file to download
+        small: Fetch in one request instead of a chunked download
+    """
+    request = client.files().get_media(fileId=file_id)
+    if small:
+        return request.execute(num_retries=3)
+
+    fh = io.BytesIO()
+    downloader = MediaIoBaseDownload(fh, request, chunksize=DOWNLOAD_CHUNK_BYTES)
+    done = False
+    while not done:
+        # Retry transient 5xx / connection errors per chunk instead of
+        # failing the whole publishing run.
+        status, done = downloader.next_chunk(num_retries=3)
+    return fh.getvalue()
+
+# (parent_id, folder name) → folder id. Drive folder ids are stable, so the
+# date/platform folders are looked up once per process rather than per draft.
+_folder_id_cache: Dict[Tuple[str, str], str] = {}
+
+def _resolve_folder(client, parent_id: str, name: str) -> str:
+    """Return the id of folder *name* under *parent_id*, memoised."""
+    key = (parent_id, name)
+    folder_id = _folder_id_cache.get(key)
+    if folder_id is None:
+        query = (
+            f"'{parent_id}' in parents and "
+            f"name = '{name}' and "
+            "mimeType = 'application/vnd.google-apps.folder' and "
+            "trashed = false"
+        )
+        found = find_first(client, query)
+        if not found:
+            raise FileNotFoundError(f"Folder '{name}' not found under parent ID '{parent_id}'")
+        folder_id = _folder_id_cache[key] = found["id"]
+    return folder_id
+
 def retrieve_file_from_drive_path(path_list: list, parent_id: str) -> bytes:
     """
     Retrieve a file from Google Drive using a path list.
@@ -522,29 +829,55 @@ def retrieve_file_from_drive_path(path_list: list, parent_id: str) -> bytes:
     Raises:
         FileNotFoundError: If any path segment is not found
     """
-    for i, segment in enumerate(path_list):
-        is_file = i == len(path_list) - 1
-        query = (
-            f"'{parent_id}' in parents and "
-            f"name = '{segment}' and "
-            f"mimeType {'!=' if is_file else '='} 'application/vnd.google-apps.folder' and "
-            "trashed = false"
-        )
-        result = drive.files().list(q=query, fields="files(id, name)", **LIST_KWARGS).execute()
-        items = result.get("files", [])
-        if not items:
-            raise FileNotFoundError(f"{'File' if is_file else 'Folder'} '{segment}' not found under parent ID '{parent_id}'")
-        parent_id = items[0]["id"]
+    client = _thread_drive()
+    # Intermediate folders (date / platform) resolve through the cache; only
+    # the final file lookup always goes to Drive.
+    folder_keys = []
+    for segment in path_list[:-1]:
+        folder_keys.append((parent_id, segment))
+        parent_id = _resolve_folder(client, parent_id, segment)
 
-    request = drive.files().get_media(fileId=parent_id)
-    fh = io.BytesIO()
-    downloader = MediaIoBaseDownload(fh, request)
-    done = False
-    while not done:
-        status, done = downloader.next_chunk()
+    file_name = path_list[-1]
+    query = (
+        f"'{parent_id}' in parents and "
+        f"name = '{file_name}' and "
+        "mimeType != 'application/vnd.google-apps.folder' and "
+        "trashed = false"
+    )
+    found = find_first(client, query, fields="id, size")
+    if not found:
+        # A cached folder may have been replaced; re-resolve on the next call
+        for key in folder_keys:
+            _folder_id_cache.pop(key, None)
+        raise FileNotFoundError(f"File '{file_name}' not found under parent ID '{parent_id}'")
 
-    fh.seek(0)
-    return fh.read()
+    size = int(found.get("size") or 0)
+    return get_media_bytes(client, found["id"], small=size < SMALL_FILE_BYTES)
+
+def prefetch_drafts(filenames: List[str], platform: str, parent_id: str = FOLDER_ID) -> Dict[str, bytes]:
+    """
+    Download the *platform* drafts for several articles concurrently.
+
+    Args:
+        filenames: Article filenames (as stored in the articles sheet)
+        platform: The platform whose draft to fetch (twitter, linkedin, medium)
+        parent_id: ID of the root Drive folder
+
+    Returns:
+        Dict[str, bytes]: filename → raw draft contents
+
+    Raises:
+        FileNotFoundError: If any draft is missing on Drive
+    """
+    unique = list(dict.fromkeys(filenames))
+    if not unique:
+        return {}
+
+    blobs = _get_drive_pool().map(
+        lambda name: retrieve_file_from_drive_path(path_extractor(name, platform), parent_id),
+        unique,
+    )
+    return dict(zip(unique, blobs))
 
 def path_extractor(chosen_file: str, platform: str) -> list:
     """
@@ -587,12 +920,55 @@ def get_next_social_post_id() -> int:
     return int(numeric_ids_series.max()) + 1
 
 
-# Backwards compatibility function
-def update_existing_entry(filename: str, updates: dict) -> None:
+def stage_update(excel_data: Dict[str, Any], sheet: str, match: Dict[str, Any], updates: dict) -> None:
     """
-    Legacy function for backward compatibility.
-    Updates an entry in the tracking Excel file.
+    Apply *updates* in place to every row of ``excel_data[sheet]`` whose
+    columns equal the values in *match*. Nothing is uploaded; call
+    ``flush_excel`` once all changes are staged.
+
+    Raises:
+        ValueError: If a match column is missing or no row matches
     """
+    df = excel_data[sheet]
+    mask = pd.Series(True, index=df.index)
+    for col, value in match.items():
+        if col not in df.columns:
+            raise ValueError(f"{sheet} sheet is missing '{col}' column.")
+        mask &= df[col] == value
+
+    if not mask.any():
+        raise ValueError(f"No {sheet} entry found for {match}")
+
+    for key, value in updates.items():
+        df.loc[mask, key] = value
+
+def flush_excel(excel_data: Dict[str, Any]) -> None:
+    """Write every sheet in *excel_data* and upload it over ``excel_data['file_id']``.
+
+    The workbook is serialised into memory rather than EXCEL_PATH and sent
+    as a single multipart request.
+    """
+    media = workbook_media(excel_data)
+    drive.files().update(fileId=excel_data['file_id'], media_body=media, **DRIVE_KWARGS).execute()
+    invalidate_excel_cache()
+
+def stage_existing_entry(excel_data: Dict[str, Any], filename: str, updates: dict,
+                         employee_name: Optional[str] = None) -> bool:
+    """
+    In-memory counterpart of ``update_existing_entry``: map legacy update keys
+    onto the articles / social_posts sheets of *excel_data* without uploading.
+
+    Args:
+        excel_data: Workbook as returned by ``download_excel_from_drive``
+        filename: Article filename
+        updates: Legacy-format updates (posted_on_twitter, twitter_url, …)
+        employee_name: Owner of the social post; defaults to ACTIVE_USER
+
+    Returns:
+        bool: True if anything was staged
+    """
+    staged = False
+
     # Map old format updates to new format
     new_updates = {}
     
@@ -606,7 +982,8 @@ def update_existing_entry(filename: str, updates: dict) -> None:
     
     # If we have medium updates, apply them to the articles sheet
     if new_updates:
-        update_medium_article(filename, new_updates)
+        stage_update(excel_data, 'articles', {'filename': filename}, new_updates)
+        staged = True
     
     # Handle social media updates
     social_updates = {}
@@ -627,26 +1004,38 @@ def update_existing_entry(filename: str, updates: dict) -> None:
     
     # If we have social updates, try to apply them
     if platform and social_updates:
-        # Need to find the article_id first
-        excel_data = download_excel_from_drive()
         articles_df = excel_data['articles']
         
         article_match = articles_df["filename"] == filename
         if article_match.any():
             article_id = articles_df.loc[article_match, "id"].iloc[0]
             
-            # Try to update for current user
-            active_user = os.environ.get("ACTIVE_USER", None)
-            if active_user:
+            # Try to update for the given / current user
+            employee_name = employee_name or os.environ.get("ACTIVE_USER", None)
+            if employee_name:
                 try:
-                    update_social_post(active_user, platform, article_id, social_updates)
+                    stage_update(
+                        excel_data,
+                        'social_posts',
+                        {"employee_name": employee_name, "platform": platform, "article_id": article_id},
+                        social_updates,
+                    )
+                    staged = True
                 except ValueError:
                     # If not found for current user, just print a warning
-                    print(f"[WARN] No matching social post entry found for {active_user} on {platform} for article {article_id}")
+                    print(f"[WARN] No matching social post entry found for {employee_name} on {platform} for article {article_id}")
             else:
                 print("[WARN] No active user set, can't update social post entry")
 
-    if 'social_accounts' not in excel_data:
-        excel_data['social_accounts'] = pd.DataFrame(columns=SOCIAL_ACCOUNTS_COLUMNS) # type: ignore
-    if 'social_posts' not in excel_data:
-        excel_data['social_posts'] = pd.DataFrame(columns=SOCIAL_POSTS_COLUMNS) # type: ignore
\ No newline at end of file
+    return staged
+
+
+# Backwards compatibility function
+def update_existing_entry(filename: str, updates: dict) -> None:
+    """
+    Legacy function for backward compatibility.
+    Updates an entry in the tracking Excel file.
+    """
+    excel_data = download_excel_from_drive()
+    if stage_existing_entry(excel_data, filename, updates):
+        flush_excel(excel_data)
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+HTTP session helper
+
+One place to build the keep-alive ``requests`` sessions used for the
+LinkedIn, Twitter and URL-shortener calls, so every client shares the same
+pool size and retry policy.
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+POOL_CONNECTIONS = 8
+POOL_MAXSIZE = 16
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def pooled_session() -> requests.Session:
+    """Return a ``requests.Session`` with a keep-alive pool and retries for https.
+
+    Reusing the session pays the TCP/TLS handshake once per process instead
+    of once per request. urllib3 only retries POSTs on connection errors,
+    never after the request reached the server, so a post is not published
+    twice and a single-use OAuth code is not replayed.
+    """
+    session = requests.Session()
+    session.mount(
+        "https://",
+        HTTPAdapter(
+            pool_connections=POOL_CONNECTIONS,
+            pool_maxsize=POOL_MAXSIZE,
+            max_retries=Retry(total=RETRY_TOTAL, backoff_factor=RETRY_BACKOFF, status_forcelist=RETRY_STATUSES),
+        ),
+    )
+    return session
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+OAuth callback server
+
+Local HTTP server used by the LinkedIn and Twitter sign-in flows. Each flow
+supplies its port and a route table; the server redirects the browser to
+the provider, handles the callback and stops itself once a route reports
+the flow as finished.
+"""
+
+import threading
+import urllib.parse
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Callable, Dict, Optional
+
+
+@dataclass(frozen=True)
+class Reply:
+    """Response of a route: an HTML *body*, or a redirect to *location*.
+
+    ``done`` shuts the server down after the response has been sent.
+    """
+    status: int
+    body: str = ""
+    location: Optional[str] = None
+    done: bool = False
+
+
+Route = Callable[[Dict[str, str]], Reply]
+
+
+class OAuthCallbackServer:
+    """Serves *routes* (path → handler of the query args) on *port*."""
+
+    def __init__(self, port: int, routes: Dict[str, Route]):
+        self.port = port
+        self.routes = routes
+        self._server: Optional[HTTPServer] = None
+        self._lock = threading.Lock()
+
+    def _handler_class(self):
+        routes = self.routes
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urllib.parse.urlparse(self.path)
+                route = routes.get(parsed.path)
+                if route is None:
+                    reply = Reply(404, "Not found")
+                else:
+                    reply = route(dict(urllib.parse.parse_qsl(parsed.query)))
+
+                if reply.location:
+                    self.send_response(reply.status)
+                    self.send_header("Location", reply.location)
+                    self.end_headers()
+                else:
+                    payload = reply.body.encode("utf-8")
+                    self.send_response(reply.status)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+
+                if reply.done:
+                    # shutdown() blocks until serve_forever() returns, so it
+                    # must not run on this handler's thread
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+        return Handler
+
+    def _serve(self, srv: HTTPServer) -> None:
+        try:
+            srv.serve_forever()
+        finally:
+            srv.server_close()
+            with self._lock:
+                if self._server is srv:
+                    self._server = None
+
+    def start(self) -> HTTPServer:
+        """Bind the server (once) and serve it on a daemon thread.
+
+        The socket is bound before the browser is opened, so the first
+        redirect can never race server start-up.
+        """
+        with self._lock:
+            if self._server is None:
+                self._server = HTTPServer(("0.0.0.0", self.port), self._handler_class())
+                threading.Thread(target=self._serve, args=(self._server,), daemon=True).start()
+            return self._server
+
+    def serve_until_done(self, on_ready: Optional[Callable[[], None]] = None) -> None:
+        """Serve on the calling thread until a route finishes the flow.
+
+        *on_ready* runs once the socket is bound (e.g. to open the browser).
+        """
+        srv = HTTPServer(("0.0.0.0", self.port), self._handler_class())
+        if on_ready is not None:
+            on_ready()
+        try:
+            srv.serve_forever()
+        finally:
+            srv.server_close()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Rate limiting helpers
+
+Small thread-safe primitives used to pace calls to third-party APIs
+(LinkedIn, Twitter, Google Trends …) when work is spread across a
+ThreadPoolExecutor.
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket.
+
+    Holds at most *capacity* tokens and refills at *rate* tokens per second.
+    ``consume()`` blocks the calling thread until enough tokens are
+    available, so every worker sharing one bucket follows a single global
+    schedule instead of sleeping independently.
+    """
+
+    def __init__(self, capacity: float, rate: float):
+        if capacity <= 0 or rate <= 0:
+            raise ValueError("capacity and rate must be positive")
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def consume(self, tokens: float = 1.0) -> None:
+        """Block until *tokens* are available, then take them."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
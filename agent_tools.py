@@ -1,4 +1,4 @@
-from langchain.tools import Tool, StructuredTool
+from langchain.tools import StructuredTool
 from pydantic import BaseModel, Field
 from core import (
     generate_keywords, create_content, publish_medium,
@@ -68,10 +68,10 @@ def _publish_medium_dynamic(filename: str = "", browser_type: str = "chromium"):
     return _run_with_logs(publish_medium, arg, browser)
 
 def _post_linkedin_wrapper(*_args, **_kwargs):
-    return _run_with_logs(post_linkedin())
+    return _run_with_logs(post_linkedin)
 
 def _post_twitter_wrapper(user, *_args, **_kwargs):
-    return _run_with_logs(post_twitter(user))
+    return _run_with_logs(post_twitter, user)
 
 # -----------------------------
 
@@ -131,16 +131,20 @@ TOOLS = [
         description="Post on X/Twitter embedding the Medium URL",
         args_schema=_NoArgs,
     ),
-    Tool.from_function(
+    # No-argument schemas, so the agent's free-text input is never passed on
+    # (refresh_linkedin_token would take it as the user id to sign in for)
+    StructuredTool.from_function(
         name="refresh_twitter_token",
-        func=refresh_twitter_token,
+        func=lambda: refresh_twitter_token(),
         description="Renew the Twitter OAuth token (rarely needed)",
+        args_schema=_NoArgs,
         high_cost = True,
     ),
-    Tool.from_function(
+    StructuredTool.from_function(
         name="refresh_linkedin_token",
-        func=refresh_linkedin_token,
+        func=lambda: refresh_linkedin_token(),
         description="Renew the LinkedIn OAuth token",
+        args_schema=_NoArgs,
         high_cost = True,
     ),
 ]
@@ -288,7 +288,7 @@ def download_excel_from_drive() -> Tuple[Dict[str, pd.DataFrame], str]:
             "id": pd.Series(dtype="int"),
             "filename": pd.Series(dtype="str"),
             "date": pd.Series(dtype="str"),
-            "posted_medium": pd.Series(dtype="bool"),
+            "posted_medium": pd.Series(dtype="boolean"),
             "keyword": pd.Series(dtype="str"),
             "medium_url": pd.Series(dtype="str")
         })
@@ -304,7 +304,7 @@ def download_excel_from_drive() -> Tuple[Dict[str, pd.DataFrame], str]:
             "employee_name": pd.Series(dtype="str"),
             "platform": pd.Series(dtype="str"),
             "article_id": pd.Series(dtype="int"),
-            "posted": pd.Series(dtype="bool"),
+            "posted": pd.Series(dtype="boolean"),
             "post_date": pd.Series(dtype="str"),
             "post_url": pd.Series(dtype="str")
         })
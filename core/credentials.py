@@ -45,6 +45,7 @@ from __future__ import annotations
 
 import json
 import os
+import threading
 from pathlib import Path
 from typing import Any, Mapping, MutableMapping
 
@@ -146,10 +147,21 @@ for _json_key, _env_key in _GLOBAL_MAP.items():
 # without re-implementing JSON handling everywhere.
 # ---------------------------------------------------------------------------
 
+# Serialises writers. Saves run synchronously on the thread that just
+# updated the tokens, so the dump never races that thread's own mutation of
+# the nested dicts.
+_save_lock = threading.Lock()
+
+
 def save() -> None:
     """Flush the in-memory credential data back to disk (pretty-printed)."""
-    with _DEFAULT_PATH.open("w", encoding="utf-8") as _fp:
-        json.dump(_DATA, _fp, indent=2) 
+    with _save_lock:
+        # Write a sibling file and swap it in, so an interrupted write never
+        # leaves a truncated credentials file behind.
+        tmp = _DEFAULT_PATH.with_name(_DEFAULT_PATH.name + ".tmp")
+        with tmp.open("w", encoding="utf-8") as _fp:
+            json.dump(_DATA, _fp, indent=2)
+        os.replace(tmp, _DEFAULT_PATH)
 
 
 if __name__ == "__main__":
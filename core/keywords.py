@@ -10,9 +10,11 @@ keyword_research_llm_pytrends.py
 
 import os
 import json
+import heapq
 import time
 import random
 import re
+import tempfile
 import openai
 from pytrends.request import TrendReq
 import warnings
@@ -22,6 +24,15 @@ import threading
 warnings.simplefilter("ignore", FutureWarning)
 load_dotenv()
 
+try:  # orjson is optional – C-speed serialisation for the keyword export
+    import orjson
+
+    def _dumps_indented(data) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+except ImportError:  # pragma: no cover – fall back to stdlib json
+    def _dumps_indented(data) -> bytes:
+        return json.dumps(data, indent=2).encode("utf-8")
+
 from core.credentials import global_cfg
 
 global_cfg = global_cfg()
@@ -71,6 +82,24 @@ SEED_PAUSE_SEC    = 60  # long break duration
 
 # === HELPERS ===
 
+def write_json_atomic(path: str, data) -> None:
+    """Write *data* as indented JSON to *path* atomically.
+
+    The JSON goes to a temp file in the same directory which then replaces
+    *path*, so concurrent readers (e.g. the Streamlit app) never see a
+    truncated file and a crash mid-write leaves the previous file intact.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_dumps_indented(data))
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
 def sanitize(text: str) -> str:
     """Strip out anything except letters, numbers and spaces."""
     clean = re.sub(r'[^A-Za-z0-9 \-]+', ' ', text)
@@ -172,7 +201,6 @@ def generate_keywords(seeds: list[str] | None = None, output_file: str | None =
             print(f"{kw!r}: {score}")
             if score is not None and score >= MIN_AVG_INTEREST:
                 local_scored.append({"keyword": kw, "avg_interest": score})
-            time.sleep(random.uniform(0.3, 0.6))
         return local_scored
 
     scored: list[dict] = []
@@ -197,12 +225,14 @@ def generate_keywords(seeds: list[str] | None = None, output_file: str | None =
         kw, sc = item["keyword"], item["avg_interest"]
         by_kw[kw] = max(sc, by_kw.get(kw, 0))
 
-    combined = [{"keyword": k, "avg_interest": v} for k, v in by_kw.items()]
-    combined.sort(key=lambda x: x["avg_interest"], reverse=True)
-    top = combined[:TOP_N]
-    os.makedirs(os.path.dirname(keywords_output_path), exist_ok=True)
-    with open(keywords_output_path, "w") as f:
-        json.dump(top, f, indent=2)
+    # only the TOP_N best are kept, so select them with a bounded heap
+    # instead of sorting every scored keyword
+    top = heapq.nlargest(
+        TOP_N,
+        ({"keyword": k, "avg_interest": v} for k, v in by_kw.items()),
+        key=lambda x: x["avg_interest"],
+    )
+    write_json_atomic(keywords_output_path, top)
 
     print(f"\n✅ Exported {len(top)} trending keywords to {keywords_output_path}")
 
@@ -217,6 +247,7 @@ def generate_keywords(seeds: list[str] | None = None, output_file: str | None =
 # ── Rate-limiter for PyTrends calls ──────────────────────────────────────────
 
 _PYTRENDS_MIN_INTERVAL = 1.0  # seconds between calls (adjust as desired)
+_PYTRENDS_JITTER = 0.1        # random extra spacing so calls don't look scripted
 _last_pytrends_ts: float = 0.0
 _pytrends_lock = threading.Lock()
 
@@ -224,12 +255,16 @@ def _acquire_pytrends_slot():
     """Block until at least _PYTRENDS_MIN_INTERVAL seconds passed since the
     previous PyTrends request across *all* threads. This helps prevent rate
     limiting or temporary bans from Google Trends when many worker threads
-    are active simultaneously."""
+    are active simultaneously.
+
+    This is the only pacing applied to PyTrends calls; the jitter lives here
+    so it is part of the global schedule rather than stacked on top of it."""
 
     global _last_pytrends_ts
     with _pytrends_lock:
         now = time.time()
-        wait = _PYTRENDS_MIN_INTERVAL - (now - _last_pytrends_ts)
+        interval = _PYTRENDS_MIN_INTERVAL + random.uniform(0, _PYTRENDS_JITTER)
+        wait = interval - (now - _last_pytrends_ts)
         if wait > 0:
             time.sleep(wait)
         _last_pytrends_ts = time.time()
@@ -1,13 +1,26 @@
 # Standard libs
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 
 # External deps
 from dotenv import load_dotenv
-import requests
+
+try:  # orjson is optional – several times faster than the stdlib encoder
+    import orjson
+
+    def _json_value(value: Any) -> str:
+        return orjson.dumps(value).decode("utf-8")
+except ImportError:  # pragma: no cover – fall back to stdlib json
+    def _json_value(value: Any) -> str:
+        return json.dumps(value, ensure_ascii=False)
 
 from core.credentials import global_cfg, user as _user_creds
+from core.linkedin_token import ensure_valid_token
+from Utils.http_session import pooled_session
+from Utils.rate_limit import TokenBucket
 
 global_cfg = global_cfg()
 
@@ -19,17 +32,41 @@ load_dotenv()
 DATABASE: str = global_cfg["blog_content_database"]
 EXCEL_NAME: str = global_cfg["excel_name"]
 
+# ---------- Publishing concurrency ----------
+# LinkedIn throttles share creation per member, so posts run on a small pool
+# and every API call draws from one bucket: short bursts are fine, a long
+# backlog is paced at roughly one post per second.
+PUBLISH_WORKERS: int = 4
+_linkedin_bucket = TokenBucket(capacity=4, rate=1.0)
+
+# ---------- HTTP session ----------
+# One keep-alive session for every LinkedIn call so the TLS handshake is paid
+# once per process rather than once per post.
+_SESSION = pooled_session()
+
+# ---------- ugcPosts payload ----------
+# Everything except author, text and visibility is fixed, so the body is
+# rendered from a pre-built template instead of serialising a nested dict
+# on every post.  Values are JSON-encoded before being interpolated.
+_PAYLOAD_TMPL = (
+    '{{"author":{author},"lifecycleState":"PUBLISHED",'
+    '"specificContent":{{"com.linkedin.ugc.ShareContent":{{'
+    '"shareCommentary":{{"text":{text}}},"shareMediaCategory":"NONE"}}}},'
+    '"visibility":{{"com.linkedin.ugc.MemberNetworkVisibility":{vis}}}}}'
+)
+
 def post_to_linkedin(
-    text_lines: List[str],
+    text: Union[str, List[str]],
     access_token: Optional[str] = None,
     author_urn: Optional[str] = None,
     visibility: str = "PUBLIC",
 ) -> Dict[str, Any]:
     """
-    Publish a LinkedIn post composed of the given lines of text.
+    Publish a LinkedIn post with the given text.
 
     Args:
-        text_lines:    List of strings, each a line in the post body.
+        text:          The post body, either as a single string or as a list of
+                       lines that are joined with newlines.
         access_token:  OAuth2 Bearer token (defaults to env var LINKEDIN_ACCESS_TOKEN).
         author_urn:    LinkedIn author URN (defaults to env var LINKEDIN_AUTHOR_URN),
                        e.g. "urn:li:person:1234ABCD".
@@ -49,7 +86,7 @@ def post_to_linkedin(
         )
 
     # Join lines into a single text block
-    post_text = "\n".join(text_lines).strip()
+    post_text = (text if isinstance(text, str) else "\n".join(text)).strip()
     if not post_text:
         raise ValueError("Post text is empty.")
 
@@ -60,24 +97,14 @@ def post_to_linkedin(
         "X-Restli-Protocol-Version": "2.0.0",
         "Content-Type": "application/json"
     }
-    payload = {
-        "author": author_urn,
-        "lifecycleState": "PUBLISHED",
-        "specificContent": {
-            "com.linkedin.ugc.ShareContent": {
-                "shareCommentary": {
-                    "text": post_text
-                },
-                "shareMediaCategory": "NONE"
-            }
-        },
-        "visibility": {
-            "com.linkedin.ugc.MemberNetworkVisibility": visibility
-        }
-    }
+    body = _PAYLOAD_TMPL.format(
+        author=_json_value(author_urn),
+        text=_json_value(post_text),
+        vis=_json_value(visibility),
+    )
 
     # Send request
-    response = requests.post(url, headers=headers, json=payload)
+    response = _SESSION.post(url, headers=headers, data=body.encode("utf-8"))
     if response.status_code != 201:
         raise Exception(
             f"LinkedIn API error {response.status_code}: {response.text}"
@@ -88,11 +115,11 @@ def post_to_linkedin(
 def post_linkedin() -> dict:
     # Import needed functions here to avoid circular import
     from Utils.google_drive import (
-        update_existing_entry,
-        retrieve_file_from_drive_path,
-        path_extractor,
+        download_excel_from_drive,
+        stage_existing_entry,
+        flush_excel,
+        prefetch_drafts,
         get_unpublished_filenames,
-        FOLDER_ID
     )
     
     # 2) Find target folder
@@ -103,7 +130,17 @@ def post_linkedin() -> dict:
     # Excel updates map to the correct row.
     # ------------------------------------------------------------------
     active_user: Optional[str] = os.getenv("ACTIVE_USER")
-    unpublished_files = get_unpublished_filenames(platform, employee_name=active_user)
+    # Cheap check first: an unchanged workbook that had nothing pending on
+    # the last run is not downloaded at all.
+    if not get_unpublished_filenames(platform, employee_name=active_user):
+        print("No LinkedIn posts pending.")
+        return {"status": "nothing_to_publish"}
+
+    # The workbook is downloaded once: pending entries are read from it and
+    # every successful post is staged into it, then it is uploaded once.
+    # (The check above already parsed it, so this is a checksum-only GET.)
+    excel_data = download_excel_from_drive()
+    unpublished_files = get_unpublished_filenames(platform, employee_name=active_user, excel_data=excel_data)
     successes: list[dict] = []
     failures: list[dict] = []
 
@@ -115,47 +152,71 @@ def post_linkedin() -> dict:
         print("No LinkedIn posts pending.")
         return {"status": "nothing_to_publish"}
 
-    for i in unpublished_files:
-        # build the Drive path for LinkedIn
-        filename = i["filename"]
-        medium_url = i["medium_url"]
-        file_path = path_extractor(filename, platform)
-        
-        # fetch and decode the file
-        raw = retrieve_file_from_drive_path(file_path, FOLDER_ID)
-        text_lines = raw.decode('utf-8').splitlines()
-        processed_lines = [line.replace("{{medium_link}}", medium_url) for line in text_lines]
-
-        # -------------------------------------------------
-        # LinkedIn credentials (per ACTIVE_USER)
-        # -------------------------------------------------
-        _li_creds = _user_creds().get("linkedin", {})
-        _ACCESS_TOKEN: Optional[str] = _li_creds.get("access_token")
-        _AUTHOR_URN: Optional[str] = _li_creds.get("author_urn")
-
-        token = _ACCESS_TOKEN
-        urn = _AUTHOR_URN
-        if not token or not urn:
-            print("[ERROR] Missing LinkedIn token or author URN in credentials JSON")
-            failures.append({"filename": filename, "error": "missing_credentials"})
-            continue
-
-        try:
-            result = post_to_linkedin(processed_lines, token, urn)
-            post_id = result.get("id", "")
-            post_url = f"https://www.linkedin.com/feed/update/{post_id}" if post_id else ""
-            print(f"✅ Post created. Url: {post_url}")
-            updates = {
-                "posted_on_linkedin": True,
-                "linkedin_date": datetime.now().strftime("%Y-%m-%d"),
-                "linkedin_url": post_url,
-            }
-            update_existing_entry(filename = filename, updates = updates)
-            successes.append({"filename": filename, "url": post_url})
-
-        except Exception as e:
-            print("❌ Failed to post to LinkedIn:", e)
-            failures.append({"filename": filename, "error": str(e)})
+    def _publish(post_text: str, token: str, urn: str) -> str:
+        _linkedin_bucket.consume()
+        result = post_to_linkedin(post_text, token, urn)
+        post_id = result.get("id", "")
+        return f"https://www.linkedin.com/feed/update/{post_id}" if post_id else ""
+
+    # -------------------------------------------------
+    # LinkedIn credentials (per ACTIVE_USER), resolved once per run. The
+    # access token is renewed up front (silently when LinkedIn issued a
+    # refresh token) rather than letting every post fail with a 401.
+    # -------------------------------------------------
+    _li_creds = _user_creds(active_user).get("linkedin", {})
+    urn: Optional[str] = _li_creds.get("author_urn")
+    token: Optional[str] = ensure_valid_token(active_user)
+    if not token and _li_creds.get("access_token"):
+        # Stored but expired and not silently renewable: a sign-in is needed,
+        # not a config fix
+        print("[ERROR] LinkedIn token expired and could not be renewed – sign in again")
+        return {"status": "error", "error": "token_expired"}
+    if not token or not urn:
+        print("[ERROR] Missing LinkedIn token or author URN in credentials JSON")
+        return {"status": "error", "error": "missing_credentials"}
+
+    # Download every pending draft up front in parallel so the publish loop
+    # below does no Drive I/O.
+    blobs = prefetch_drafts([i["filename"] for i in unpublished_files], platform)
+
+    today = datetime.now().strftime("%Y-%m-%d")
+    try:
+        with ThreadPoolExecutor(max_workers=PUBLISH_WORKERS) as ex:
+            futures = {}
+
+            for i in unpublished_files:
+                filename = i["filename"]
+                medium_url = i["medium_url"]
+
+                # decode the prefetched file and fill in the Medium link;
+                # splitlines/join keeps the old normalisation of \r\n (and
+                # other line separators) to \n
+                text = "\n".join(blobs[filename].decode('utf-8').splitlines())
+                post_text = text.replace("{{medium_link}}", medium_url)
+                futures[ex.submit(_publish, post_text, token, urn)] = filename
+
+            # Staging mutates the shared workbook, so it happens here on the
+            # calling thread while the remaining posts are still in flight.
+            for fut in as_completed(futures):
+                filename = futures[fut]
+                try:
+                    post_url = fut.result()
+                    print(f"✅ Post created. Url: {post_url}")
+                    updates = {
+                        "posted_on_linkedin": True,
+                        "linkedin_date": today,
+                        "linkedin_url": post_url,
+                    }
+                    stage_existing_entry(excel_data, filename, updates, employee_name=active_user)
+                    successes.append({"filename": filename, "url": post_url})
+
+                except Exception as e:
+                    print("❌ Failed to post to LinkedIn:", e)
+                    failures.append({"filename": filename, "error": str(e)})
+    finally:
+        # Record whatever was posted, even if the run is interrupted
+        if successes:
+            flush_excel(excel_data)
 
     return {
         "status": "done",
@@ -1,14 +1,18 @@
+import html
 import os
 import secrets
 import threading
+import time
 import webbrowser
 import requests
 import urllib.parse
 
+from typing import Dict, Optional, Tuple
 from urllib.parse import urlencode
-from flask import Flask, redirect, request
 # Centralised credential handling
-from core.credentials import user as _user_creds, save as _save_creds
+from core.credentials import user as _user_creds, users, save as _save_creds, _default_user_id
+from Utils.http_session import pooled_session
+from Utils.oauth_server import OAuthCallbackServer, Reply
 
 # Load .env after credentials so user overrides still win
 from dotenv import load_dotenv
@@ -42,48 +46,80 @@ else:
     SCOPE_LIST = DEFAULT_SCOPES
 
 SCOPE = SCOPE_LIST
-STATE         = secrets.token_urlsafe(16)
 # ─── PORT DERIVED FROM REDIRECT_URI ──────────────────────────────────────
-# Automatically pick the port specified in the REDIRECT_URI so the Flask
+# Automatically pick the port specified in the REDIRECT_URI so the callback
 # server always listens on the correct one even after env-file edits.
 _parsed = urllib.parse.urlparse(REDIRECT_URL)
 
 # --- Always use fixed local port for LinkedIn OAuth ---
 PORT = 8001
 
+TOKEN_URL = "https://www.linkedin.com/oauth/v2/accessToken"
+# Renew tokens this many seconds before LinkedIn would reject them.
+EXPIRY_MARGIN_SEC = 60
+
+# Token exchange, profile lookup and refresh share one keep-alive pool.
+_SESSION = pooled_session()
+
 # ─────────────────────────────────────────────────────────────────────────
 
-app = Flask(__name__)
+# OAuth state is generated per sign-in flow rather than once at import, so
+# a module reload between redirect and callback cannot invalidate it.
+# Maps an ephemeral session id to the state value issued for that flow and
+# the user who started it, whose credentials receive the new token.
+_pending: Dict[str, Tuple[str, str]] = {}
+_pending_lock = threading.Lock()
+
+
+def _new_state(user_id: str) -> str:
+    sid = secrets.token_urlsafe(8)
+    state = secrets.token_urlsafe(16)
+    with _pending_lock:
+        _pending[sid] = (state, user_id)
+    return f"{sid}:{state}"
+
 
+def _check_state(value: Optional[str]) -> Optional[str]:
+    """Return the user id the flow was started for, or None if *value* is not a valid state."""
+    sid, sep, state = (value or "").partition(":")
+    if not sep:
+        return None
+    with _pending_lock:
+        expected = _pending.pop(sid, None)
+    if expected is None or not secrets.compare_digest(expected[0], state):
+        return None
+    return expected[1]
 
-@app.route("/auth/linkedin")
-def auth():
+
+def _auth_url(user_id: str) -> str:
     params = {
         "response_type": "code",
         "client_id":     CLIENT_ID,
         "redirect_uri":  REDIRECT_URL,
         "scope":         " ".join(SCOPE),
-        "state":         STATE
+        "state":         _new_state(user_id)
     }
-    auth_url = "https://www.linkedin.com/oauth/v2/authorization?" + urlencode(params)
-    return redirect(auth_url)
+    return "https://www.linkedin.com/oauth/v2/authorization?" + urlencode(params)
 
 
-@app.route("/auth/linkedin/callback")
-def callback():
+def _handle_callback(args: dict) -> Tuple[int, str, Optional[dict]]:
+    """Process the OAuth redirect; return (status, html body, token data)."""
     # 1) error from LinkedIn?
-    if "error" in request.args:
-        desc = request.args.get("error_description", "Unknown error")
-        return f"❌ LinkedIn error: {desc}", 400
+    if "error" in args:
+        desc = args.get("error_description", "Unknown error")
+        return 400, f"❌ LinkedIn error: {desc}", None
 
     # 2) CSRF check
-    if request.args.get("state") != STATE:
-        return "❌ Invalid state parameter", 400
+    user_id = _check_state(args.get("state"))
+    if user_id is None:
+        return 400, "❌ Invalid state parameter", None
 
     # 3) exchange code for token
-    code = request.args["code"]
-    resp = requests.post(
-        "https://www.linkedin.com/oauth/v2/accessToken",
+    code = args.get("code")
+    if not code:
+        return 400, "❌ Missing authorization code", None
+    resp = _SESSION.post(
+        TOKEN_URL,
         data={
             "grant_type":    "authorization_code",
             "code":          code,
@@ -103,51 +139,162 @@ def callback():
         "Accept":        "application/json"
     }
 
-    resp = requests.get("https://api.linkedin.com/v2/userinfo", headers=headers)
+    resp = _SESSION.get("https://api.linkedin.com/v2/userinfo", headers=headers)
     resp.raise_for_status()
     profile = resp.json()
     member_id = profile["sub"]
     author_urn = f"urn:li:person:{member_id}"
     token_data["author_urn"] = author_urn
     
-    # 4) persist to credentials JSON under current user
-    linkedin_credentials.update({
+    # 4) persist to credentials JSON under the user who started the flow
+    creds = _user_creds(user_id).setdefault("linkedin", {})
+    creds.update({
         "access_token": access_token,
         "scope": token_data.get("scope", ""),
         "author_urn": author_urn,
-        "expires_in": token_data.get("expires_in", 0),
         "token_type": token_data.get("token_type", ""),
         "id_token": token_data.get("id_token", ""),
     })
+    _store_expiry(creds, token_data)
     _save_creds()
 
-    # 5) shut down the dev server
-    shutdown = request.environ.get("werkzeug.server.shutdown")
-    if shutdown:
-        shutdown()
-
-
-    return (
+    body = (
         f"Access token: {access_token}<br>"
         f"Granted scopes: {token_data.get('scope')}<br>"
         f"Author urn: {author_urn}"
     )
+    return 200, body, token_data
+
+
+def _callback_route(args: dict) -> Reply:
+    try:
+        status, body, token_data = _handle_callback(args)
+    except requests.RequestException as e:
+        return Reply(502, f"❌ LinkedIn token exchange failed: {e}")
+    # 5) stop serving once the token has been stored
+    return Reply(status, body, done=token_data is not None)
+
+
+def _start_route(args: dict) -> Reply:
+    # Reject unknown users before LinkedIn is involved: after the code
+    # exchange it would be too late to report it without losing the token
+    user_id = args.get("user") or _default_user_id()
+    if user_id not in users():
+        return Reply(400, f"❌ Unknown user: {html.escape(user_id)}")
+    return Reply(302, location=_auth_url(user_id))
+
+
+_callback_server = OAuthCallbackServer(PORT, {
+    "/auth/linkedin/callback": _callback_route,
+    "/auth/linkedin": _start_route,
+})
+
+
+def _store_expiry(creds: dict, token_data: dict) -> None:
+    """Record absolute expiry times (and the refresh token, if any) in *creds*."""
+    now = time.time()
+    expires_in = int(token_data.get("expires_in", 0) or 0)
+    creds["expires_in"] = expires_in
+    creds["expires_at"] = now + expires_in if expires_in else 0
+    if token_data.get("refresh_token"):
+        creds["refresh_token"] = token_data["refresh_token"]
+        refresh_in = int(token_data.get("refresh_token_expires_in", 0) or 0)
+        creds["refresh_token_expires_at"] = now + refresh_in if refresh_in else 0
+
+
+def _refresh_with_refresh_token(creds: dict) -> bool:
+    """Renew the access token without user interaction.
+
+    Only works for apps LinkedIn has enabled for programmatic refresh tokens;
+    returns False when no (valid) refresh token is stored or the call fails.
+    """
+    refresh_token = creds.get("refresh_token")
+    refresh_expires_at = float(creds.get("refresh_token_expires_at") or 0)
+    if not refresh_token or (refresh_expires_at and time.time() >= refresh_expires_at):
+        return False
+
+    try:
+        resp = _SESSION.post(
+            TOKEN_URL,
+            data={
+                "grant_type":    "refresh_token",
+                "refresh_token": refresh_token,
+                "client_id":     creds.get("client_id", CLIENT_ID),
+                "client_secret": creds.get("client_secret", CLIENT_SECRET),
+            },
+            headers={"Content-Type": "application/x-www-form-urlencoded"}
+        )
+    except requests.RequestException as e:
+        print(f"[WARN] LinkedIn token refresh failed: {e}")
+        return False
+
+    if not resp.ok:
+        print(f"[WARN] LinkedIn token refresh failed ({resp.status_code}): {resp.text}")
+        return False
+
+    token_data = resp.json()
+    if "access_token" not in token_data:
+        print(f"[WARN] No access token in LinkedIn refresh response: {token_data}")
+        return False
+
+    creds["access_token"] = token_data["access_token"]
+    _store_expiry(creds, token_data)
+    _save_creds()
+    print("[INFO] LinkedIn access token refreshed")
+    return True
+
+
+def refresh_if_expiring(user_id: Optional[str] = None, margin: float = EXPIRY_MARGIN_SEC) -> bool:
+    """Silently renew *user_id*'s token if it expires within *margin* seconds.
+
+    Only ever uses the refresh-token grant, never the browser sign-in, so it
+    is safe from unattended jobs. Returns True when a usable token is stored
+    afterwards.
+    """
+    creds = _user_creds(user_id).get("linkedin", {})
+    token = creds.get("access_token")
+    expires_at = float(creds.get("expires_at") or 0)
+
+    if token and (not expires_at or time.time() < expires_at - margin):
+        return True
+    return _refresh_with_refresh_token(creds)
+
+
+def ensure_valid_token(user_id: Optional[str] = None, margin: float = EXPIRY_MARGIN_SEC) -> Optional[str]:
+    """Return a usable LinkedIn access token for *user_id* (defaults to ACTIVE_USER).
+
+    The stored token is returned as-is while it is more than *margin*
+    seconds away from expiry (or when its expiry is unknown).
+    Otherwise it is renewed silently via the refresh-token grant. When that
+    is impossible None is returned; signing in again through
+    ``refresh_linkedin_token`` is left to the caller, since this also runs
+    from headless agent and scheduler processes.
+    """
+    if refresh_if_expiring(user_id, margin):
+        return _user_creds(user_id).get("linkedin", {}).get("access_token")
+
+    print(f"[ERROR] LinkedIn token for {user_id or _default_user_id()!r} is missing or expired "
+          "and cannot be refreshed silently – sign in again with refresh_linkedin_token()")
+    return None
+
+
+def _sign_in_url(user_id: Optional[str] = None) -> str:
+    uid = user_id or _default_user_id()
+    return "http://localhost:8001/auth/linkedin?" + urlencode({"user": uid})
 
 
-def refresh_linkedin_token():
-    threading.Thread(
-        target=lambda: app.run(host="0.0.0.0", port=PORT, debug=False, use_reloader=False),
-        daemon=True,
-    ).start()
-    webbrowser.open("http://localhost:8001/auth/linkedin")
+def refresh_linkedin_token(user_id: Optional[str] = None):
+    """Open the browser sign-in; the new token is stored for *user_id* (defaults to ACTIVE_USER)."""
+    # Reuses the callback server if an earlier flow already started it.
+    _callback_server.start()
+    webbrowser.open(_sign_in_url(user_id))
 
 
 def main():
-    # Run Flask in the main thread (blocking) so the process stays alive when
-    # this script is executed directly from the command line.
-    webbrowser.open("http://localhost:8001/auth/linkedin")
-    app.run(host="0.0.0.0", port=PORT, debug=True, use_reloader=False)
-    # or run it in a thread and join a short moment
+    # Serve in the main thread (blocking) so the process stays alive when
+    # this script is executed directly from the command line; it returns
+    # once the callback has been handled.
+    _callback_server.serve_until_done(lambda: webbrowser.open(_sign_in_url()))
 
 
 if __name__ == "__main__":
@@ -1,17 +1,33 @@
+import json
 import os
 import time
 from datetime import datetime
 from dotenv import load_dotenv
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+from googleapiclient.errors import HttpError
+from playwright.sync_api import sync_playwright, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+import numpy as np
 import pandas as pd
 import requests
-from googleapiclient.http import MediaIoBaseDownload, MediaFileUpload
 import io
 import random
+import threading
+from contextlib import contextmanager
 from typing import Tuple, cast, Dict, List, Optional, Any
 from core.credentials import google, global_cfg
+from Utils.http_session import pooled_session
+from Utils.google_drive import (
+    DRIVE_KWARGS,
+    EXCEL_READ_ENGINE,
+    FOLDER_ID,
+    drive,
+    ensure_excel_on_drive,
+    flag_is,
+    forget_excel_file_id,
+    get_media_bytes,
+    normalise_flag_columns,
+    prefetch_drafts,
+    workbook_media,
+)
 
 gcreds = google()                 # → plain dict
 global_cfg = global_cfg()
@@ -23,27 +39,28 @@ DATABASE: str = global_cfg["blog_content_database"]
 EXCEL_NAME: str = global_cfg["excel_name"]
 
 # ---------- Drive Configuration ----------
+# The Drive client and folder configuration are shared with the social
+# publishers through Utils.google_drive.
 GOOGLE_EMAIL         = gcreds["google_email"]
 GOOGLE_PASSWORD      = gcreds["google_password"]
-SERVICE_ACCOUNT_FILE = gcreds["service_account_json"]
-DRIVE_SCOPE             = [gcreds["drive_scope"]]
-DRIVE_FOLDER_ID: str = gcreds["drive_folder_id"]
-SHARED_DRIVE_ID        = gcreds["shared_drive_id"]
-DRIVE_KWARGS: dict[str, object] = {"supportsAllDrives": True}
-LIST_KWARGS: dict[str, object] = {"supportsAllDrives": True, "includeItemsFromAllDrives": True}
-if SHARED_DRIVE_ID:
-    LIST_KWARGS.update({"driveId": SHARED_DRIVE_ID, "corpora": "drive"})
-
-creds = service_account.Credentials.from_service_account_file(
-    SERVICE_ACCOUNT_FILE,
-    scopes=DRIVE_SCOPE
-)
-drive = build("drive", "v3", credentials=creds)
+DRIVE_FOLDER_ID: str = FOLDER_ID
 
 # ---------- Excel Configuration ----------
 EXCEL_PATH: str = os.path.join(DATABASE, EXCEL_NAME)
 os.makedirs(os.path.dirname(EXCEL_PATH) or '.', exist_ok=True)
 
+# ---------- HTTP Session ----------
+# Shared keep-alive pool for plain HTTP calls (URL shortener).
+_SESSION = pooled_session()
+
+# ---------- Browser Session ----------
+# Playwright storage state (cookies + local storage) of the logged-in Medium
+# session, reused across runs to skip the Google sign-in.
+MEDIUM_STATE_FILE: str = os.getenv(
+    "MEDIUM_STATE_FILE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Config", "medium_state.json"),
+)
+
 # Define column structures for the sheets - matching create_excel_structure.py
 ARTICLES_COLUMNS = [
     "id", "filename", "date", "posted_medium", "keyword", "medium_url"
@@ -57,92 +74,6 @@ SOCIAL_POSTS_COLUMNS = [
     "id", "employee_name", "platform", "article_id", "posted", "post_date", "post_url"
 ]
 
-def ensure_excel_on_drive() -> str:
-    """Return the Drive file-id for the tracking Excel.
-    If it doesn't exist, create a blank sheet locally and upload it, then
-    return the new file id.
-    """
-    query = f"name = '{EXCEL_NAME}' and '{DRIVE_FOLDER_ID}' in parents"
-    result = drive.files().list(q=query, fields="files(id, name)", **LIST_KWARGS).execute()
-    files = result.get("files", [])
-    if files:
-        return files[0]["id"]
-
-    # --- bootstrap a fresh sheet with the three-sheet structure ---
-    # Create empty dataframes with correct column types
-    articles_df = pd.DataFrame({
-        "id": pd.Series(dtype="int"),
-        "filename": pd.Series(dtype="str"),
-        "date": pd.Series(dtype="str"),
-        "posted_medium": pd.Series(dtype="bool"),
-        "keyword": pd.Series(dtype="str"),
-        "medium_url": pd.Series(dtype="str")
-    })
-
-    social_accounts_df = pd.DataFrame({
-        "id": pd.Series(dtype="int"),
-        "employee_name": pd.Series(dtype="str"),
-        "platform": pd.Series(dtype="str")
-    })
-
-    social_posts_df = pd.DataFrame({
-        "id": pd.Series(dtype="int"),
-        "employee_name": pd.Series(dtype="str"),
-        "platform": pd.Series(dtype="str"),
-        "article_id": pd.Series(dtype="int"),
-        "posted": pd.Series(dtype="bool"),
-        "post_date": pd.Series(dtype="str"),
-        "post_url": pd.Series(dtype="str")
-    })
-
-    # Write to Excel with all three sheets
-    with pd.ExcelWriter(EXCEL_PATH, engine='openpyxl') as writer:
-        articles_df.to_excel(writer, sheet_name='articles', index=False)
-        social_accounts_df.to_excel(writer, sheet_name='social_accounts', index=False)
-        social_posts_df.to_excel(writer, sheet_name='social_posts', index=False)
-
-    media = MediaFileUpload(
-        EXCEL_PATH,
-        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-    )
-    metadata = {"name": EXCEL_NAME, "parents": [DRIVE_FOLDER_ID]}
-    file = drive.files().create(body=metadata, media_body=media, fields="id", **DRIVE_KWARGS).execute()
-    print(f"[INFO] Created new tracking sheet on Drive ({file['id']})")
-    return file["id"]
-
-def retrieve_file_from_drive_path(path_list: list, parent_id: str) -> bytes:
-    if not DRIVE_FOLDER_ID:
-        raise RuntimeError("DRIVE_FOLDER_ID env var is missing")
-
-    for i, segment in enumerate(path_list):
-        is_file = i == len(path_list) - 1
-        query = (
-            f"'{parent_id}' in parents and "
-            f"name = '{segment}' and "
-            f"mimeType {'!=' if is_file else '='} 'application/vnd.google-apps.folder' and "
-            "trashed = false"
-        )
-        result = drive.files().list(q=query, fields="files(id, name)", **LIST_KWARGS).execute()
-        items = result.get("files", [])
-        if not items:
-            raise FileNotFoundError(f"{'File' if is_file else 'Folder'} '{segment}' not found under parent ID '{parent_id}'")
-        parent_id = items[0]["id"]
-
-    request = drive.files().get_media(fileId=parent_id)
-    fh = io.BytesIO()
-    downloader = MediaIoBaseDownload(fh, request)
-    done = False
-    while not done:
-        status, done = downloader.next_chunk()
-
-    fh.seek(0)
-    return fh.read()
-
-def path_extractor(chosen_file: str, platform: str) -> list:
-    date_part = chosen_file.split('_')[0]
-    file_path = [date_part, platform, f"{platform}_{chosen_file}"]
-    return file_path
-
 def _retry(fn, attempts: int = 3, delay: float = 1.0):
     """Simple retry helper for transient network/SSL errors."""
     for i in range(1, attempts + 1):
@@ -157,67 +88,136 @@ def _retry(fn, attempts: int = 3, delay: float = 1.0):
                 continue
             raise
 
+# Per-run workbook cache. It is only populated inside ``excel_session()`` so
+# long-lived callers (Streamlit, the scheduler) never see stale sheets, while
+# a publish run downloads and parses the tracking Excel exactly once. It is
+# kept per thread, so concurrent runs (Streamlit reruns, server workers)
+# never share or tear down each other's workbook.
+_session_state = threading.local()
+
+def _active_cache() -> Optional[Dict[str, Any]]:
+    return getattr(_session_state, "cache", None)
+
+@contextmanager
+def excel_session():
+    """Share one download of the tracking Excel across every helper called
+    inside the ``with`` block. Yields ``(excel_data, file_id)``.
+
+    Helpers keep the cached dataframes in sync with what they upload, so the
+    cache stays valid for the whole block. Nested sessions reuse the outer one.
+    """
+    owner = _active_cache() is None
+    if owner:
+        _session_state.cache = {}
+    try:
+        yield download_excel_from_drive()
+    finally:
+        if owner:
+            _session_state.cache = None
+
+def invalidate_excel_cache() -> None:
+    """Drop the cached workbook so the next read goes back to Drive."""
+    cache = _active_cache()
+    if cache is not None:
+        cache.clear()
+
+def _download_workbook_bytes() -> Tuple[str, bytes]:
+    """Return ``(file_id, raw xlsx bytes)`` of the tracking Excel."""
+    file_id = ensure_excel_on_drive()
+    try:
+        return file_id, get_media_bytes(drive, file_id)
+    except HttpError as e:
+        if e.resp.status != 404:
+            raise
+        # Remembered id went stale (file deleted / replaced) – look it up again
+        forget_excel_file_id()
+        file_id = ensure_excel_on_drive()
+        return file_id, get_media_bytes(drive, file_id)
+
+def download_sheet(name: str, columns: Optional[List[str]] = None) -> Tuple[Optional[pd.DataFrame], str]:
+    """
+    Return a single sheet of the tracking Excel (``None`` if the workbook has
+    no such sheet) and the file ID. Only that sheet is parsed, and only
+    *columns* of it when given (missing ones are simply absent, so callers'
+    column checks still apply); inside ``excel_session()`` the full sheet is
+    served from the cached workbook instead.
+    """
+    cache = _active_cache()
+    if cache:
+        return cache["data"].get(name), cache["file_id"]
+
+    def _download():
+        file_id, raw = _download_workbook_bytes()
+        with pd.ExcelFile(io.BytesIO(raw), engine=EXCEL_READ_ENGINE) as xl:
+            if name not in xl.sheet_names:
+                return None, file_id
+            usecols = (lambda c: c in columns) if columns else None
+            df = xl.parse(name, usecols=usecols)
+        normalise_flag_columns({name: df})
+        return df, file_id
+
+    return cast(Tuple[Optional[pd.DataFrame], str], _retry(_download))
+
 def download_excel_from_drive() -> Tuple[Dict[str, pd.DataFrame], str]:
     """
     Download the Excel file from Drive and return a dictionary of dataframes,
-    one for each sheet, and the file ID.
+    one for each sheet, and the file ID. Inside ``excel_session()`` the
+    cached copy is returned instead.
     
     Returns:
         Tuple[Dict[str, pd.DataFrame], str]: A tuple containing the dictionary of dataframes
         (one per sheet) and the file ID.
     """
     def _download():
-        file_id = ensure_excel_on_drive()
-        request = drive.files().get_media(fileId=file_id)
-        fh = io.BytesIO()
-        downloader = MediaIoBaseDownload(fh, request)
-        done = False
-        while not done:
-            status, done = downloader.next_chunk()
-        fh.seek(0)
+        file_id, raw = _download_workbook_bytes()
+        fh = io.BytesIO(raw)
         
         # Read all sheets into a dictionary of dataframes
-        excel_data = pd.read_excel(fh, sheet_name=None)
+        excel_data = pd.read_excel(fh, sheet_name=None, engine=EXCEL_READ_ENGINE)
+        normalise_flag_columns(excel_data)
         
         # Return the dictionary of dataframes and the file ID
         return excel_data, file_id
 
-    return cast(Tuple[Dict[str, pd.DataFrame], str], _retry(_download))
+    cache = _active_cache()
+    if cache:
+        return cache["data"], cache["file_id"]
+
+    excel_data, file_id = cast(Tuple[Dict[str, pd.DataFrame], str], _retry(_download))
+    if cache is not None:
+        cache.update(data=excel_data, file_id=file_id)
+    return excel_data, file_id
+
+def _upload_excel(file_id: str, excel_data: Dict[str, pd.DataFrame]) -> None:
+    """Upload *excel_data* over *file_id*; drop the cache if that fails so the
+    in-memory sheets never diverge silently from Drive."""
+    media = workbook_media(excel_data)
+    try:
+        drive.files().update(fileId=file_id, media_body=media, **DRIVE_KWARGS).execute()
+    except Exception:
+        invalidate_excel_cache()
+        raise
 
 def get_unpublished_filenames() -> List[str]:
     """
     Get a list of filenames from the articles sheet where posted_medium is False
     """
-    excel_data, _ = download_excel_from_drive()
+    articles_df, _ = download_sheet('articles', ['filename', 'posted_medium'])
     
     # Check if we have the articles sheet
-    if 'articles' not in excel_data:
+    if articles_df is None:
         raise ValueError("Excel file must contain an 'articles' sheet.")
     
-    articles_df = excel_data['articles']
-    
     # Check if necessary columns exist
     if "posted_medium" not in articles_df.columns or "filename" not in articles_df.columns:
         raise ValueError("Articles sheet must contain 'posted_medium' and 'filename' columns.")
     
     # Get unpublished filenames
-    return articles_df[articles_df["posted_medium"] == False]["filename"].tolist()
+    return articles_df.loc[flag_is(articles_df["posted_medium"], False), "filename"].to_numpy().tolist()
 
-def get_next_social_post_id() -> int:
-    """Return the next integer ID for the *social_posts* sheet.
-
-    Robust against cases where the ``id`` column exists but contains
-    only *NaN* / non-numeric entries (which would make ``max()`` return
-    *NaN* and crash when cast to ``int``)."""
-
-    excel_data, _ = download_excel_from_drive()
-
-    # If the sheet is missing or empty → 1
-    if 'social_posts' not in excel_data:
-        return 1
-
-    social_posts_df = excel_data['social_posts']
-    if social_posts_df.empty or 'id' not in social_posts_df.columns:
+def _next_social_post_id(social_posts_df: Optional[pd.DataFrame]) -> int:
+    """``max(id) + 1`` over *social_posts_df*, or 1 when there is no usable id."""
+    if social_posts_df is None or social_posts_df.empty or 'id' not in social_posts_df.columns:
         return 1
 
     # Convert to numeric, coercing errors to NaN, then drop NaN rows
@@ -228,15 +228,23 @@ def get_next_social_post_id() -> int:
 
     return int(numeric_ids_series.max()) + 1  # type: ignore[call-arg]
 
+def get_next_social_post_id() -> int:
+    """Return the next integer ID for the *social_posts* sheet.
+
+    Robust against cases where the ``id`` column exists but contains
+    only *NaN* / non-numeric entries (which would make ``max()`` return
+    *NaN* and crash when cast to ``int``)."""
+
+    social_posts_df, _ = download_sheet('social_posts', ['id'])
+    return _next_social_post_id(social_posts_df)
+
 def get_article_id_by_filename(filename: str) -> Optional[int]:
     """Get the article ID for a given filename"""
-    excel_data, _ = download_excel_from_drive()
+    articles_df, _ = download_sheet('articles', ['id', 'filename'])
     
-    if 'articles' not in excel_data:
+    if articles_df is None:
         raise ValueError("Excel file must contain an 'articles' sheet.")
     
-    articles_df = excel_data['articles']
-    
     if "id" not in articles_df.columns or "filename" not in articles_df.columns:
         raise ValueError("Articles sheet must contain 'id' and 'filename' columns.")
     
@@ -248,8 +256,27 @@ def get_article_id_by_filename(filename: str) -> Optional[int]:
     return int(matching_rows.iloc[0]["id"])
 
 def shorten_url(url):
-    response = requests.get(f"http://tinyurl.com/api-create.php?url={url}")
-    return response.text.strip()
+    """Return the TinyURL for *url*, or *url* itself if TinyURL fails.
+
+    This runs after the article is already live on Medium, so a shortener
+    outage must not stop the Excel update that marks it as published.
+    """
+    try:
+        response = _SESSION.get("https://tinyurl.com/api-create.php", params={"url": url}, timeout=15)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        print(f"[WARN] Could not shorten {url} ({e}) – using the full URL")
+        return url
+    return response.text.strip() or url
+
+# ---------- Medium editor selectors ----------
+WRITE_BTN         = "a[data-testid='headerWriteButton']"
+TITLE_H3          = "h3[data-testid='editorTitleParagraph']"
+BODY_P            = "p[data-testid='editorParagraphText']"
+PREPUBLISH_BTN    = "button[data-action='show-prepublish']"
+PREPUBLISH_READY  = "button[data-action='show-prepublish']:not(.button--disabledPrimary)"
+TOPIC_INPUT       = 'p[data-testid="editorParagraphText"] >> text="Add a topic…"'
+CONFIRM_BTN       = "button[data-testid='publishConfirmButton']"
 
 def login_medium(page):
     # 1) Go to Medium's mobile sign-in
@@ -275,42 +302,132 @@ def login_medium(page):
     page.click("button:has-text('Next')")
 
     # 5) Wait to be back on Medium
-    page.wait_for_selector("a[data-testid='headerWriteButton']", timeout=30_000)
+    page.wait_for_selector(WRITE_BTN, timeout=30_000)
+
+def _open_medium_session(browser):
+    """Return a logged-in ``(context, page)`` on Medium.
+
+    Cookies saved by a previous run are tried first; the full Google SSO
+    flow only runs when they are missing or no longer accepted, and its
+    result is saved for next time.
+    """
+    if os.path.exists(MEDIUM_STATE_FILE):
+        ctx = browser.new_context(storage_state=MEDIUM_STATE_FILE)
+        page = ctx.new_page()
+        page.goto("https://medium.com/", wait_until="domcontentloaded")
+        try:
+            page.wait_for_selector(WRITE_BTN, timeout=10_000)
+            print("✅ Reused saved Medium session.")
+            return ctx, page
+        except PlaywrightTimeoutError:
+            print("[INFO] Saved Medium session expired – signing in again")
+            ctx.close()
+
+    ctx = browser.new_context()
+    page = ctx.new_page()
+    login_medium(page)
+    print("✅ Logged in.")
+    _save_medium_state(ctx)
+    return ctx, page
+
+def _save_medium_state(ctx) -> None:
+    """Write *ctx*'s cookies to MEDIUM_STATE_FILE, readable by the owner only.
+
+    The file holds live Google and Medium session cookies, so it is created
+    with 0600 permissions (and its directory on first use) rather than left
+    to Playwright's default mode.
+    """
+    os.makedirs(os.path.dirname(MEDIUM_STATE_FILE) or ".", exist_ok=True)
+    state = ctx.storage_state()
+    fd = os.open(MEDIUM_STATE_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as fp:
+        json.dump(state, fp)
+    # os.open only applies the mode to new files
+    os.chmod(MEDIUM_STATE_FILE, 0o600)
+
+# How long to wait for a paste to show up in the editor before falling back
+PASTE_CHECK_MS = 5_000
+
+def _editor_shows(page, snippet: str) -> bool:
+    """True once the focused editor's text contains *snippet*."""
+    try:
+        page.wait_for_function(
+            "s => (document.activeElement?.innerText || '').includes(s)",
+            arg=snippet,
+            timeout=PASTE_CHECK_MS,
+        )
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+_EDITOR_TEXT_JS = "() => (document.activeElement?.innerText || '').trim()"
+
+def _type_lines(page, text: str) -> None:
+    """Type *text* key by key, one line at a time with Shift+Enter soft breaks."""
+    lines = text.split("\n")
+    for i, line in enumerate(lines):
+        page.keyboard.type(line)
+        if i < len(lines) - 1:
+            page.keyboard.press("Shift+Enter")
+
+def _paste_text(page, text: str) -> None:
+    """Insert *text* at the caret in a single browser round-trip.
+
+    Typing key-by-key costs one CDP message per character, which dominated
+    publish time for long articles. The body is pasted through the
+    clipboard, so each line becomes its own Medium paragraph (typing used
+    Shift+Enter soft breaks). The editor is only typed into key by key
+    when the clipboard is refused (Firefox) or the paste left it
+    unchanged, so a paste Medium rewrote (smart quotes, markdown
+    shortcuts …) is never followed by a second copy of the body.
+    """
+    # First non-blank line, trimmed so editor whitespace handling can't hide it
+    snippet = next((line.strip()[:40] for line in text.splitlines() if line.strip()), "")
+    before = page.evaluate(_EDITOR_TEXT_JS)
+    try:
+        page.context.grant_permissions(["clipboard-read", "clipboard-write"], origin="https://medium.com")
+        page.evaluate("txt => navigator.clipboard.writeText(txt)", text)
+        page.keyboard.press("ControlOrMeta+V")
+    except PlaywrightError:
+        print("[WARN] Clipboard unavailable – typing the Medium body instead")
+        _type_lines(page, text)
+        return
+
+    if not snippet or _editor_shows(page, snippet):
+        return
+    if page.evaluate(_EDITOR_TEXT_JS) != before:
+        print("[WARN] Pasted Medium body differs from the draft (editor rewrite?) – keeping it")
+        return
+    print("[WARN] Clipboard paste did not reach the Medium editor – typing the body instead")
+    _type_lines(page, text)
 
 def post_to_medium(page, title: str, content: str):
     page.goto("https://medium.com/", wait_until="networkidle")
-    page.wait_for_selector('a[data-testid="headerWriteButton"]', timeout=10_000)
-    page.click('a[data-testid="headerWriteButton"]')
+    # locator.click() auto-waits for the element, so no separate
+    # wait_for_selector round-trip is needed before each click. ``.first``
+    # keeps the non-strict matching page.click() had.
+    page.locator(WRITE_BTN).first.click(timeout=10_000)
 
-    title_h3 = page.locator("h3[data-testid='editorTitleParagraph']")
+    title_h3 = page.locator(TITLE_H3)
     title_h3.wait_for(timeout=15_000)
     time.sleep(1)
 
     title_h3.click()
     page.keyboard.type(title)
 
-    body_para = page.locator("p[data-testid='editorParagraphText']")
-    body_para.wait_for(timeout=15_000)
+    body_para = page.locator(BODY_P).first
+    body_para.click(timeout=15_000)
+    _paste_text(page, content)
 
-    page.click("p[data-testid='editorParagraphText']", timeout=10_000)
-    lines = content.split("\n")
-    for i, line in enumerate(lines):
-        page.keyboard.type(line)
-        if i < len(lines) - 1:
-            page.keyboard.press("Shift+Enter")
-
-    page.click("button[data-action='show-prepublish']", timeout=10_000)    
-    page.wait_for_selector(
-        "button[data-action='show-prepublish']:not(.button--disabledPrimary)",
-        timeout=15_000
-    )
+    page.locator(PREPUBLISH_BTN).first.click(timeout=10_000)
+    page.locator(PREPUBLISH_READY).first.wait_for(timeout=15_000)
 
-    page.click('p[data-testid="editorParagraphText"] >> text="Add a topic…"', timeout=10_000)
+    page.locator(TOPIC_INPUT).first.click(timeout=10_000)
     page.keyboard.type("smart contracts")
     page.keyboard.press("Enter")
 
     with page.expect_navigation():
-        page.click("button[data-testid='publishConfirmButton']", timeout=10_000)
+        page.locator(CONFIRM_BTN).first.click(timeout=10_000)
 
     article_url = page.url
     page.wait_for_timeout(3_000)
@@ -318,10 +435,10 @@ def post_to_medium(page, title: str, content: str):
     return article_url
 
 
-def update_article_entry(filename: str, updates: dict):
-    """Update an article entry in the articles sheet"""
-    excel_data, file_id = download_excel_from_drive()
-    
+def update_article_entry(excel_data: Dict[str, pd.DataFrame], filename: str, updates: dict) -> None:
+    """Apply *updates* to the matching row of ``excel_data['articles']`` in place.
+
+    Nothing is uploaded; ``apply_updates_and_upload`` uploads once all changes are staged."""
     if 'articles' not in excel_data:
         raise ValueError("Excel file must contain an 'articles' sheet.")
     
@@ -339,17 +456,63 @@ def update_article_entry(filename: str, updates: dict):
     for key, value in updates.items():
         articles_df.loc[match, key] = value
 
-    # Save and upload
-    with pd.ExcelWriter(EXCEL_PATH, engine='openpyxl') as writer:
-        articles_df.to_excel(writer, sheet_name='articles', index=False)
-        
-        # Preserve other sheets
-        for sheet_name, df in excel_data.items():
-            if sheet_name != 'articles':
-                df.to_excel(writer, sheet_name=sheet_name, index=False)
+def build_social_posts(excel_data: Dict[str, pd.DataFrame], article_id: int) -> pd.DataFrame:
+    """Build (but do not add) one pending social_posts row per social account."""
+    if 'social_accounts' not in excel_data or 'social_posts' not in excel_data:
+        raise ValueError("Excel file must contain 'social_accounts' and 'social_posts' sheets.")
     
-    media = MediaFileUpload(EXCEL_PATH, mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-    drive.files().update(fileId=file_id, media_body=media, **DRIVE_KWARGS).execute()
+    social_accounts_df = excel_data['social_accounts']
+    
+    # Check if necessary columns exist
+    required_columns = ['id', 'employee_name', 'platform']
+    for col in required_columns:
+        if col not in social_accounts_df.columns:
+            raise ValueError(f"Social accounts sheet missing required column: {col}")
+    
+    # IDs continue from the sheet already in memory – no second download
+    next_id = _next_social_post_id(excel_data['social_posts'])
+    new_posts_df = social_accounts_df[['employee_name', 'platform']].assign(
+        id=np.arange(next_id, next_id + len(social_accounts_df), dtype=np.int64),
+        article_id=article_id,
+        posted=False,
+        post_date="",
+        post_url="",
+    )
+    return new_posts_df[SOCIAL_POSTS_COLUMNS].reset_index(drop=True)
+
+def _append_rows(df: pd.DataFrame, rows: pd.DataFrame) -> pd.DataFrame:
+    """Return *df* with *rows* appended in a single allocation.
+
+    An empty sheet is simply replaced (conformed to its header), skipping
+    the copy and the all-NA dtype inference ``pd.concat`` would do.
+    """
+    if df.empty:
+        columns = list(dict.fromkeys([*df.columns, *rows.columns]))
+        return rows.reindex(columns=columns).reset_index(drop=True)
+    return pd.concat([df, rows], ignore_index=True)
+
+def apply_updates_and_upload(
+    excel_data: Dict[str, pd.DataFrame],
+    file_id: str,
+    article_updates: Optional[Dict[str, dict]] = None,
+    new_social_posts: Optional[pd.DataFrame] = None,
+) -> None:
+    """
+    Apply every staged change to *excel_data* and upload the workbook once.
+
+    Args:
+        excel_data: Sheets as returned by ``download_excel_from_drive``; mutated in place
+        file_id: Drive id of the tracking Excel
+        article_updates: filename → column/value updates for the articles sheet
+        new_social_posts: Rows to append to the social_posts sheet
+    """
+    for name, updates in (article_updates or {}).items():
+        update_article_entry(excel_data, name, updates)
+
+    if new_social_posts is not None and not new_social_posts.empty:
+        excel_data['social_posts'] = _append_rows(excel_data['social_posts'], new_social_posts)
+
+    _upload_excel(file_id, excel_data)
 
 def create_social_post_entries(article_id: int, medium_url: str) -> int:
     """
@@ -364,56 +527,9 @@ def create_social_post_entries(article_id: int, medium_url: str) -> int:
         int: The number of social post entries created
     """
     excel_data, file_id = download_excel_from_drive()
-    
-    if 'social_accounts' not in excel_data or 'social_posts' not in excel_data:
-        raise ValueError("Excel file must contain 'social_accounts' and 'social_posts' sheets.")
-    
-    social_accounts_df = excel_data['social_accounts']
-    social_posts_df = excel_data['social_posts']
-    
-    # Check if necessary columns exist
-    required_columns = ['id', 'employee_name', 'platform']
-    for col in required_columns:
-        if col not in social_accounts_df.columns:
-            raise ValueError(f"Social accounts sheet missing required column: {col}")
-    
-    # Get the next available ID for social posts
-    next_id = get_next_social_post_id()
-    
-    # Create new entries for all social accounts
-    new_posts = []
-    for _, account in social_accounts_df.iterrows():
-        new_post = {
-            "id": next_id,
-            "employee_name": account["employee_name"],
-            "platform": account["platform"],
-            "article_id": article_id,
-            "posted": False,
-            "post_date": "",
-            "post_url": ""
-        }
-        new_posts.append(new_post)
-        next_id += 1
-    
-    # Add the new posts to the dataframe
-    if new_posts:
-        new_posts_df = pd.DataFrame(new_posts)
-        social_posts_df = pd.concat([social_posts_df, new_posts_df], ignore_index=True)
-    
-    # Save and upload
-    with pd.ExcelWriter(EXCEL_PATH, engine='openpyxl') as writer:
-        # Write all sheets
-        for sheet_name, df in excel_data.items():
-            if sheet_name != 'social_posts':
-                df.to_excel(writer, sheet_name=sheet_name, index=False)
-        
-        # Write the updated social_posts sheet
-        social_posts_df.to_excel(writer, sheet_name='social_posts', index=False)
-    
-    media = MediaFileUpload(EXCEL_PATH, mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-    drive.files().update(fileId=file_id, media_body=media, **DRIVE_KWARGS).execute()
-    
-    return len(new_posts)
+    new_posts_df = build_social_posts(excel_data, article_id)
+    apply_updates_and_upload(excel_data, file_id, new_social_posts=new_posts_df)
+    return len(new_posts_df)
 
 def publish_medium(filename: str | None = None, browser_type: str = "chromium"):
     """Publish unpublished draft(s) to Medium.
@@ -429,6 +545,11 @@ def publish_medium(filename: str | None = None, browser_type: str = "chromium"):
         • When *filename* omitted  → list[dict] of the above for every published draft.
     """
 
+    # One workbook download serves every sheet lookup/update in this run
+    with excel_session():
+        return _publish_medium(filename, browser_type)
+
+def _publish_medium(filename: str | None, browser_type: str):
     # 1) Identify unpublished drafts via the articles sheet
     unpublished_files = get_unpublished_filenames()
     if not unpublished_files:
@@ -448,44 +569,42 @@ def publish_medium(filename: str | None = None, browser_type: str = "chromium"):
         files_to_publish = [chosen_file]
         print(f"[INFO] Will publish first draft: {chosen_file}")
 
+    if not DRIVE_FOLDER_ID:
+        raise RuntimeError("DRIVE_FOLDER_ID env var is missing")
+
+    # Download every markdown draft up front, in parallel, so none of the
+    # Drive round-trips sit between browser sessions
+    drafts = prefetch_drafts(files_to_publish, 'medium', DRIVE_FOLDER_ID)
+
     results: list[dict] = []
 
-    for chosen_file in files_to_publish:
-        print(f"\n[INFO] Publishing: {chosen_file}")
+    # -------- One browser session for every draft --------
+    with sync_playwright() as pw:
+        # Launch the selected browser
+        if browser_type.lower() == "firefox":
+            browser = pw.firefox.launch(headless=False)
+            print(f"[INFO] Using Firefox browser")
+        else:
+            browser = pw.chromium.launch(headless=False)
+            print(f"[INFO] Using Chromium browser")
 
-        # Build Drive path for the markdown draft
-        file_path = path_extractor(chosen_file, 'medium')
+        ctx, page = _open_medium_session(browser)
 
-        if not DRIVE_FOLDER_ID:
-            raise RuntimeError("DRIVE_FOLDER_ID env var is missing")
+        for chosen_file in files_to_publish:
+            print(f"\n[INFO] Publishing: {chosen_file}")
 
-        raw = retrieve_file_from_drive_path(file_path, DRIVE_FOLDER_ID)
-        text = raw.decode('utf-8').splitlines()
+            text = drafts[chosen_file].decode('utf-8').splitlines()
 
-        # -------- Prepare title & body --------
-        title = ""
-        for line in text:
-            if line.strip():
-                title = line.lstrip('# ').strip().replace("**", "")
-                break
+            # -------- Prepare title & body --------
+            title = ""
+            for line in text:
+                if line.strip():
+                    title = line.lstrip('# ').strip().replace("**", "")
+                    break
 
-        body_txt = "\n".join(text[1:]).replace("**", "")
+            body_txt = "\n".join(text[1:]).replace("**", "")
 
-        # -------- Post using Playwright --------
-        with sync_playwright() as pw:
-            # Launch the selected browser
-            if browser_type.lower() == "firefox":
-                browser = pw.firefox.launch(headless=False)
-                print(f"[INFO] Using Firefox browser")
-            else:
-                browser = pw.chromium.launch(headless=False)
-                print(f"[INFO] Using Chromium browser")
-                
-            ctx     = browser.new_context()
-            page    = ctx.new_page()
-
-            login_medium(page)
-            print("✅ Logged in.")
+            # -------- Post using Playwright --------
             article_url = post_to_medium(page, title, body_txt)
             medium_url  = shorten_url(article_url)
             print(f"✅ Published: {title!r}")
@@ -496,26 +615,33 @@ def publish_medium(filename: str | None = None, browser_type: str = "chromium"):
                 "date": datetime.now().strftime("%Y-%m-%d"),
                 "medium_url": medium_url,
             }
-            update_article_entry(filename=chosen_file, updates=updates)
+            # Stage the social-post tasks alongside it so the workbook is
+            # written and uploaded once for both changes
+            excel_data, file_id = download_excel_from_drive()
+            article_id = get_article_id_by_filename(chosen_file)
+            new_posts = build_social_posts(excel_data, article_id) if article_id is not None else None
+            apply_updates_and_upload(
+                excel_data,
+                file_id,
+                article_updates={chosen_file: updates},
+                new_social_posts=new_posts,
+            )
             print("✅ Articles sheet updated")
 
-            # Create social-post tasks
-            article_id = get_article_id_by_filename(chosen_file)
-            if article_id is not None:
-                num_posts = create_social_post_entries(article_id, medium_url)
-                print(f"✅ Created {num_posts} social post entries")
+            if new_posts is not None:
+                print(f"✅ Created {len(new_posts)} social post entries")
             else:
                 print("❌ Failed to find article ID, social post entries not created")
 
-            ctx.close()
-            browser.close()
-
-        results.append({
-            "status": "published",
-            "file": chosen_file,
-            "title": title,
-            "url": medium_url,
-        })
+            results.append({
+                "status": "published",
+                "file": chosen_file,
+                "title": title,
+                "url": medium_url,
+            })
+
+        ctx.close()
+        browser.close()
 
     # ------ Return results ------
     if len(results) == 1:
@@ -1,11 +1,14 @@
-import requests
 from typing import List, Dict, Any, Optional
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
 from dotenv import load_dotenv
 
 from core.credentials import global_cfg, user as _user_creds
+from core.twitter_token import ensure_valid_token
+from Utils.http_session import pooled_session
+from Utils.rate_limit import TokenBucket
 
 global_cfg = global_cfg()
 
@@ -21,10 +24,16 @@ load_dotenv()
 DATABASE: str = global_cfg["blog_content_database"]
 EXCEL_NAME: str = global_cfg["excel_name"]
 
-# ---------- Twitter credentials (per ACTIVE_USER) ----------
-_tw_creds = _user_creds().get("twitter", {})
-_BEARER_TOKEN: Optional[str] = _tw_creds.get("access_token")
-_SCREEN_NAME: Optional[str] = _tw_creds.get("screen_name")
+# ---------- Publishing concurrency ----------
+# Tweets go out on a small pool; every POST draws from one bucket so a burst
+# of a few tweets is immediate while a long backlog is paced at about one
+# per second and stays clear of the per-user 15-minute window.
+PUBLISH_WORKERS: int = 4
+_twitter_bucket = TokenBucket(capacity=4, rate=1.0)
+
+# ---------- HTTP session ----------
+# Reused keep-alive pool so consecutive tweets share one TCP/TLS connection.
+_SESSION = pooled_session()
 
 def post_to_twitter(text: str, bearer_token: str) -> Dict[str, Any]:
     """
@@ -36,16 +45,28 @@ def post_to_twitter(text: str, bearer_token: str) -> Dict[str, Any]:
         "Content-Type": "application/json"
     }
     payload = {"text": text}
-    resp = requests.post(url, headers=headers, json=payload)
+    resp = _SESSION.post(url, headers=headers, json=payload)
     resp.raise_for_status()
     return resp.json()
 
+def _publish_one(tweet_text: str, bearer_token: str, screen_name: str) -> str:
+    """
+    Posts one tweet on a pool worker and returns its public URL.
+    Every call draws from the shared bucket, so workers never outrun the
+    per-user rate limit.
+    """
+    _twitter_bucket.consume()
+    result = post_to_twitter(tweet_text, bearer_token)
+    tweet_id = result.get("data", {}).get("id")
+    return f"https://x.com/{screen_name}/status/{tweet_id}"
+
 def post_twitter(user_id) -> dict:
     # Import needed functions here to avoid circular import
     from Utils.google_drive import (
-        update_existing_entry,
-        retrieve_file_from_drive_path,
-        path_extractor,
+        download_excel_from_drive,
+        stage_existing_entry,
+        flush_excel,
+        prefetch_drafts,
         get_unpublished_filenames as get_unpublished_entries,
         FOLDER_ID
     )
@@ -66,7 +87,9 @@ def post_twitter(user_id) -> dict:
         return {"status": "error", "error": "unknown_user"}
 
     tw_creds = user_creds.get("twitter", {})
-    bearer_token: Optional[str] = tw_creds.get("access_token")
+    # Renewed up front when it is about to expire, rather than letting the
+    # first tweet fail with a 401
+    bearer_token: Optional[str] = ensure_valid_token(user_id or active_user)
     screen_name:  Optional[str] = tw_creds.get("screen_name")
 
     if not bearer_token or not screen_name:
@@ -77,7 +100,17 @@ def post_twitter(user_id) -> dict:
     # Restrict publishing run to the active user only so updates are
     # applied to the correct social_posts rows.
     # ------------------------------------------------------------------
-    entries = get_unpublished_entries(platform, employee_name=active_user)
+    # Cheap check first: an unchanged workbook that had nothing pending on
+    # the last run is not downloaded at all.
+    if not get_unpublished_entries(platform, employee_name=active_user):
+        print("[INFO] No pending tweets to publish.")
+        return {"status": "nothing_to_publish"}
+
+    # The workbook is downloaded once: pending entries are read from it and
+    # every successful tweet is staged into it, then it is uploaded once.
+    # (The check above already parsed it, so this is a checksum-only GET.)
+    excel_data = download_excel_from_drive()
+    entries = get_unpublished_entries(platform, employee_name=active_user, excel_data=excel_data)
 
     print(f"[INFO] Found {len(entries)} pending tweet(s) to publish.")
 
@@ -92,41 +125,56 @@ def post_twitter(user_id) -> dict:
         print("[INFO] No pending tweets to publish.")
         return {"status": "nothing_to_publish"}
 
-    for entry in entries:
-        filename   = entry["filename"]
-        medium_url = entry["medium_url"]
-
-        # load the draft text
-        print(f"[STEP] Loading draft for '{filename}' from Google Drive…")
-        file_path = path_extractor(filename, platform)
-        raw = retrieve_file_from_drive_path(file_path, FOLDER_ID)
-        print("[OK] Draft retrieved; performing placeholder substitutions…")
-        text_lines = raw.decode('utf-8').splitlines()
-        processed = [line.replace("{{medium_link}}", medium_url) for line in text_lines]
-        tweet_text = "\n".join(processed).strip()
-
-        # post the tweet
-        print("[STEP] Posting tweet to X/Twitter…")
-        try:
-            result = post_to_twitter(tweet_text, bearer_token)
-            tweet_id = result.get("data", {}).get("id")
-            tweet_url = f"https://x.com/{screen_name}/status/{tweet_id}"
-            print(f"[SUCCESS] Tweet posted: {tweet_url}")
-            updates = {
-                f"posted_on_{platform}": True,
-                f"{platform}_date": datetime.now().strftime("%Y-%m-%d"),
-                f"{platform}_url": tweet_url,
-            }
+    # Fetch every draft concurrently instead of one Drive walk per tweet
+    print(f"[STEP] Loading {len(entries)} draft(s) from Google Drive…")
+    drafts = prefetch_drafts([e["filename"] for e in entries], platform, FOLDER_ID)
+    print("[OK] Drafts retrieved.")
+
+    today = datetime.now().strftime("%Y-%m-%d")
+    try:
+        with ThreadPoolExecutor(max_workers=PUBLISH_WORKERS) as ex:
+            futures = {}
+
+            for entry in entries:
+                filename   = entry["filename"]
+                medium_url = entry["medium_url"]
+
+                # decode the prefetched draft and fill in the Medium link;
+                # splitlines/join normalises \r\n (and other line separators)
+                # to \n, as core.linkedin does, so they don't count against
+                # the 280-character limit
+                text = "\n".join(drafts[filename].decode('utf-8').splitlines())
+                tweet_text = text.replace("{{medium_link}}", medium_url).strip()
+                futures[ex.submit(_publish_one, tweet_text, bearer_token, screen_name)] = (filename, tweet_text)
+
+            print(f"[STEP] Posting {len(futures)} tweet(s) to X/Twitter…")
+
+            # Staging mutates the shared workbook, so it happens here on the
+            # calling thread while the remaining tweets are still in flight.
+            for fut in as_completed(futures):
+                filename, tweet_text = futures[fut]
+                try:
+                    tweet_url = fut.result()
+                    print(f"[SUCCESS] Tweet posted: {tweet_url}")
+                    updates = {
+                        f"posted_on_{platform}": True,
+                        f"{platform}_date": today,
+                        f"{platform}_url": tweet_url,
+                    }
+                    stage_existing_entry(excel_data, filename, updates, employee_name=active_user)
+
+                    successes.append({"filename": filename, "url": tweet_url})
+
+                except Exception as e:
+                    print("[ERROR] Failed to post tweet:", e, filename, tweet_text[0:15])
+                    failures.append({"filename": filename, "error": str(e)})
+    finally:
+        # Record whatever was posted, even if the run is interrupted
+        if successes:
             print("[STEP] Updating Excel tracking sheet…")
-            update_existing_entry(filename = filename, updates = updates)
+            flush_excel(excel_data)
             print("[OK] Excel updated.")
 
-            successes.append({"filename": filename, "url": tweet_url})
-
-        except Exception as e:
-            print("[ERROR] Failed to post tweet:", e, filename, tweet_text[0:15])
-            failures.append({"filename": filename, "error": str(e)})
-
     return {
         "status": "done",
         "published": successes,
@@ -1,17 +1,23 @@
 #!/usr/bin/env python3
+import os
+import sys
 import requests
 import urllib.parse
 import secrets
 import hashlib, base64
-from flask import Flask, request, redirect
 import webbrowser
-import threading
+import time
+from typing import Optional, Tuple
 
 # Centralised credential access
 try:
     from core.credentials import user as _user_creds, save as _save_creds, _default_user_id  
 except ImportError:
     from credentials import user as _user_creds, save as _save_creds, _default_user_id
+    # Run as a script from core/: make the repo root importable for Utils
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Utils.http_session import pooled_session
+from Utils.oauth_server import OAuthCallbackServer, Reply
 
 # Keep dotenv for supplementary vars (e.g. OPENAI_API_KEY) but load AFTER we
 # patched env vars via the credentials module import above.
@@ -42,40 +48,41 @@ SCOPE = twitter_credentials["scope"]
 CODE_CHALLENGE = make_code_challenge(CODE_VERIFIER)
 TWITTER_LOCAL_SERVER = twitter_credentials.get("local_server", "http://localhost:8000/")
 
-
-# ──────────────────────────────────────────────────────────────────────────
-
-flaskApp = Flask(__name__)
+# Every authorize parameter is fixed for the life of the process, so the
+# redirect target is built once. quote(safe='') keeps the exact encoding
+# (spaces as %20) the per-request version produced.
+_AUTH_URL = "https://x.com/i/oauth2/authorize?" + urllib.parse.urlencode(
+    {
+        'response_type':        'code',
+        'client_id':            CLIENT_ID,
+        'redirect_uri':         REDIRECT_URL,
+        'scope':                SCOPE,
+        'state':                STATE,
+        'code_challenge':       CODE_CHALLENGE,
+        'code_challenge_method': 'S256',
+    },
+    quote_via=urllib.parse.quote,
+    safe='',
+)
+
+# Renew the access token this many seconds before X.com would reject it.
+EXPIRY_MARGIN_SEC = 60
+
+# Token exchange and refresh share one keep-alive pool.
+_SESSION = pooled_session()
 
 
-@flaskApp.route('/')
-def index():
-    # Redirect user to X.com for authorization
-    params = {
-        'response_type':       'code',
-        'client_id':           CLIENT_ID,
-        'redirect_uri':        REDIRECT_URL,
-        'scope':               SCOPE,
-        'state':               STATE,
-        'code_challenge':      CODE_CHALLENGE,
-        'code_challenge_method':'S256',
-    }
-    params_str = "&".join(
-        f"{k}={urllib.parse.quote(v, safe='')}"
-        for k, v in params.items()
-    )
-    auth_url = f"https://x.com/i/oauth2/authorize?{params_str}"
-    return redirect(auth_url)
+# ──────────────────────────────────────────────────────────────────────────
 
-@flaskApp.route('/auth/twitter/callback')
-def callback():
-    error = request.args.get('error')
+def _handle_callback(args: dict) -> Tuple[int, str]:
+    """Process the OAuth redirect; return (status, body)."""
+    error = args.get('error')
     if error:
-        return f"Error: {error}", 400
-    code = request.args.get('code')
-    returned_state = request.args.get('state')
+        return 400, f"Error: {error}"
+    code = args.get('code')
+    returned_state = args.get('state')
     if returned_state != STATE:
-        return 'Invalid state', 400
+        return 400, 'Invalid state'
 
     # Exchange authorization code for user-context bearer token
     token_url = "https://api.x.com/2/oauth2/token"
@@ -86,7 +93,7 @@ def callback():
         'code_verifier': CODE_VERIFIER,
         'client_id':     CLIENT_ID,
     }
-    resp = requests.post(
+    resp = _SESSION.post(
         token_url,
         data=data,
         auth=(CLIENT_ID, CLIENT_SECRET),
@@ -101,25 +108,43 @@ def callback():
     # Guard against missing access token to prevent KeyError
     if "access_token" not in token_json:
         # Return detailed error information to aid debugging
-        return (
-            f"Failed to retrieve access token. Response from Twitter: {token_json}",
-            400,
-        )
+        return 400, f"Failed to retrieve access token. Response from Twitter: {token_json}"
 
     # Persist the refreshed token back into the shared credentials JSON
     twitter_credentials["access_token"] = token_json["access_token"]
     twitter_credentials["scope"] = token_json.get("scope", "")
+    _store_expiry(twitter_credentials, token_json)
     # Also capture refresh_token if available
     if "refresh_token" in token_json:
         twitter_credentials["refresh_token"] = token_json["refresh_token"]
     _save_creds()
 
-    # Gracefully stop the local dev server so Streamlit can continue
-    shutdown = request.environ.get("werkzeug.server.shutdown")
-    if shutdown:
-        shutdown()
+    return 200, "✅ Authentication successful! Token saved. You may close this tab."
+
+
+def _callback_route(args: dict) -> Reply:
+    try:
+        status, body = _handle_callback(args)
+    except (requests.RequestException, ValueError) as e:
+        return Reply(502, f"Token exchange with X failed: {e}")
+    # Gracefully stop the callback server so Streamlit can continue.
+    return Reply(status, body, done=status == 200)
+
+
+def _start_route(args: dict) -> Reply:
+    # Redirect user to X.com for authorization
+    return Reply(302, location=_AUTH_URL)
+
 
-    return "✅ Authentication successful! Token saved. You may close this tab.", 200
+_callback_server = OAuthCallbackServer(PORT, {
+    "/auth/twitter/callback": _callback_route,
+    "/": _start_route,
+})
+
+def _store_expiry(creds: dict, token_json: dict) -> None:
+    """Record the access token's absolute expiry time in *creds* (0 if unknown)."""
+    expires_in = int(token_json.get("expires_in", 0) or 0)
+    creds["expires_at"] = time.time() + expires_in if expires_in else 0
 
 def refresh_token_auto(user_id: str = "ravi") -> bool:
     """
@@ -153,7 +178,7 @@ def refresh_token_auto(user_id: str = "ravi") -> bool:
     # Make the request
     try:
         # For confidential clients (with client secret), use basic auth
-        resp = requests.post(
+        resp = _SESSION.post(
             token_url,
             data=data,
             auth=(CLIENT_ID, CLIENT_SECRET),
@@ -171,6 +196,7 @@ def refresh_token_auto(user_id: str = "ravi") -> bool:
         if "access_token" in token_json:
             twitter_credentials["access_token"] = token_json["access_token"]
             twitter_credentials["scope"] = token_json.get("scope", twitter_credentials.get("scope", ""))
+            _store_expiry(twitter_credentials, token_json)
             
             # Update refresh token if a new one was provided
             if "refresh_token" in token_json:
@@ -187,20 +213,33 @@ def refresh_token_auto(user_id: str = "ravi") -> bool:
         print(f"Exception while refreshing token: {str(e)}")
         return False
 
+def ensure_valid_token(user_id: Optional[str] = None, margin: float = EXPIRY_MARGIN_SEC) -> Optional[str]:
+    """Return the Twitter access token for *user_id* (defaults to ACTIVE_USER).
+
+    A token within *margin* seconds of its recorded expiry is renewed first
+    via ``refresh_token_auto``, so the first tweet is not spent on a 401.
+    Tokens with no recorded expiry are returned as-is; if the refresh
+    fails the stored token is returned and callers' 401 handling applies.
+    """
+    uid = user_id or _default_user_id()
+    creds = _user_creds(uid).get("twitter", {})
+    expires_at = float(creds.get("expires_at") or 0)
+
+    if expires_at and time.time() >= expires_at - margin:
+        print("[INFO] Twitter access token about to expire – refreshing")
+        refresh_token_auto(uid)
+    return creds.get("access_token")
+
 def refresh_twitter_token():
-    # Launch Flask in a background thread so Streamlit doesn't block
-    threading.Thread(
-        target=lambda: flaskApp.run(host="0.0.0.0", port=PORT, debug=False, use_reloader=False),
-        daemon=True,
-    ).start()
+    # Serve the callback on a background thread so Streamlit doesn't block;
+    # reuses the server if an earlier flow already started it.
+    _callback_server.start()
 
     # Open browser to kick-off OAuth flow (root "/" route redirects to X.com)
     webbrowser.open(str(TWITTER_LOCAL_SERVER))
-    # flaskApp.run(host="0.0.0.0", port=PORT, debug=True, use_reloader=False)
 
 def main():
     # webbrowser.open(str(TWITTER_LOCAL_SERVER))
-    # flaskApp.run(host="0.0.0.0", port=PORT, debug=True, use_reloader=False)
     print(refresh_token_auto(user))
 if __name__ == '__main__':
     main()
@@ -8,61 +8,63 @@ and forces a new one to be created with fresh data.
 
 import os
 import sys
-import io
-from googleapiclient.http import MediaFileUpload
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 
 # Add parent directory to path to import modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from core.credentials import google, global_cfg
-from Utils.google_drive import download_excel_from_drive
+from core.credentials import global_cfg
+from Utils.google_drive import (
+    DRIVE_KWARGS,
+    FOLDER_ID,
+    cached_excel_file_id,
+    drive,
+    download_excel_from_drive,
+    find_first,
+    forget_excel_file_id,
+)
 
-# Get credentials and configuration
-gcreds = google()
+# Get configuration
 global_cfg = global_cfg()
 
 # ---------- Global Configuration ----------
 DATABASE = global_cfg["blog_content_database"]
 EXCEL_NAME = global_cfg["excel_name"]
 
-# ---------- Drive Configuration ----------
-SERVICE_ACCOUNT_FILE = gcreds["service_account_json"]
-DRIVE_SCOPES = [gcreds["drive_scope"]]
-FOLDER_ID = gcreds["drive_folder_id"]
-SHARED_DRIVE_ID = gcreds["shared_drive_id"]
+def main():
+    # The tracking Excel's id is normally remembered from earlier runs, so
+    # the delete goes out without a list round-trip first. A batch request
+    # could not help here: the delete depends on the list's result.
+    file_id = cached_excel_file_id()
+    if file_id:
+        print(f"Deleting remembered Excel file (ID: {file_id})...")
+        try:
+            drive.files().delete(fileId=file_id, **DRIVE_KWARGS).execute()
+            print("File deleted successfully.")
+        except HttpError as e:
+            if e.resp.status != 404:
+                raise
+            file_id = None  # already gone or replaced – fall back to a lookup
 
-DRIVE_KWARGS = {"supportsAllDrives": True}
-LIST_KWARGS = {"supportsAllDrives": True, "includeItemsFromAllDrives": True}
+    if not file_id:
+        # Find the existing Excel file
+        print(f"Searching for existing Excel file: {EXCEL_NAME}")
+        query = f"name = '{EXCEL_NAME}' and '{FOLDER_ID}' in parents"
+        found = find_first(drive, query)
 
-if SHARED_DRIVE_ID:
-    LIST_KWARGS.update({"driveId": SHARED_DRIVE_ID, "corpora": "drive"})
+        if found:
+            file_id = found["id"]
+            print(f"Found existing Excel file with ID: {file_id}")
 
-def main():
-    print("Initializing Drive API client...")
-    drive_creds = service_account.Credentials.from_service_account_file(
-        SERVICE_ACCOUNT_FILE,
-        scopes=DRIVE_SCOPES,
-    )
-    drive = build("drive", "v3", credentials=drive_creds)
-    
-    # Find the existing Excel file
-    print(f"Searching for existing Excel file: {EXCEL_NAME}")
-    query = f"name = '{EXCEL_NAME}' and '{FOLDER_ID}' in parents"
-    res = drive.files().list(q=query, fields="files(id,name)", **LIST_KWARGS).execute()
-    files = res.get("files", [])
-    
-    if files:
-        file_id = files[0]["id"]
-        print(f"Found existing Excel file with ID: {file_id}")
-        
-        # Delete the file
-        print("Deleting the existing Excel file...")
-        drive.files().delete(fileId=file_id, **DRIVE_KWARGS).execute()
-        print("File deleted successfully.")
-    else:
-        print("No existing Excel file found.")
+            # Delete the file
+            print("Deleting the existing Excel file...")
+            drive.files().delete(fileId=file_id, **DRIVE_KWARGS).execute()
+            print("File deleted successfully.")
+        else:
+            print("No existing Excel file found.")
+
+    # The old id must not be reused for the new file
+    forget_excel_file_id()
     
     # Force creation of a new Excel file by calling download_excel_from_drive
     print("Creating new Excel file with fresh data...")
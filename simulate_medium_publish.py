@@ -20,60 +20,84 @@ Run:
 from __future__ import annotations
 
 import random
-from datetime import datetime
-from typing import Optional
+from datetime import date
+from typing import Optional, Tuple
 
+import pandas as pd
+
+from Utils.google_drive import flag_is
 from core.medium import (
+    apply_updates_and_upload,
+    build_social_posts,
     download_excel_from_drive,
-    update_article_entry,
-    get_article_id_by_filename,
-    create_social_post_entries,
+    download_sheet,
+    excel_session,
 )
 
 DUMMY_URL_TMPL = "https://medium.com/@test-user/{slug}-{rand}"
 
 
-def _pick_first_unpublished() -> Optional[str]:
-    """Return filename of the first article whose *posted_medium* == False."""
-    excel_data, _ = download_excel_from_drive()
-    articles_df = excel_data["articles"]
+def _pick_first_unpublished() -> Optional[Tuple[str, Optional[int]]]:
+    """Return ``(filename, article_id)`` of the first article whose
+    *posted_medium* == False."""
+    # Only the columns we look at are parsed, not the whole workbook
+    articles_df, _ = download_sheet("articles", ["id", "filename", "posted_medium"])
+    if articles_df is None or "posted_medium" not in articles_df.columns:
+        return None
 
-    mask = (articles_df["posted_medium"] == False)  # noqa: E712  (want bool comparison)
-    if not mask.any():
+    # argmax finds the first True without materialising the filtered frame
+    unpublished = flag_is(articles_df["posted_medium"], False).to_numpy()
+    idx = int(unpublished.argmax()) if len(unpublished) else 0
+    if not len(unpublished) or not unpublished[idx]:
         return None
 
-    return str(articles_df[mask].iloc[0]["filename"])
+    # The id comes from the same row, so no second lookup by filename is needed
+    article_id = articles_df["id"].iat[idx] if "id" in articles_df.columns else None
+    return (
+        str(articles_df["filename"].iat[idx]),
+        None if pd.isna(article_id) else int(article_id),
+    )
 
 
 def simulate_publish() -> None:
-    filename = _pick_first_unpublished()
-    if filename is None:
+    picked = _pick_first_unpublished()
+    if picked is None:
         print("✅ All articles already marked as published – nothing to do.")
         return
 
+    # All helpers below share one download of the workbook
+    with excel_session():
+        _simulate_publish(*picked)
+
+
+def _simulate_publish(filename: str, article_id: Optional[int]) -> None:
     # --- Build a fake Medium URL ------------------------------------------------
-    slug_base = filename.replace("_", "-").replace(".md", "")
+    slug_base = filename.removesuffix(".md").replace("_", "-")
     dummy_url = DUMMY_URL_TMPL.format(slug=slug_base, rand=random.randint(1000, 9999))
 
-    # --- Update the articles sheet ---------------------------------------------
-    update_article_entry(
-        filename=filename,
-        updates={
-            "posted_medium": True,
-            "medium_url": dummy_url,
-            "date": datetime.now().strftime("%Y-%m-%d"),
+    # --- Update the articles sheet and add social-post tasks -------------------
+    # Both changes are staged on the session's workbook and uploaded once,
+    # as core.medium.publish_medium does.
+    excel_data, file_id = download_excel_from_drive()
+    new_posts = build_social_posts(excel_data, article_id) if article_id is not None else None
+    apply_updates_and_upload(
+        excel_data,
+        file_id,
+        article_updates={
+            filename: {
+                "posted_medium": True,
+                "medium_url": dummy_url,
+                "date": date.today().isoformat(),
+            },
         },
+        new_social_posts=new_posts,
     )
     print(f"[INFO] Marked '{filename}' as posted on Medium → {dummy_url}")
 
-    # --- Add social-post tasks --------------------------------------------------
-    article_id = get_article_id_by_filename(filename)
-    if article_id is None:
+    if new_posts is None:
         print("[WARN] Could not resolve article_id – social posts not created.")
         return
-
-    num_posts = create_social_post_entries(article_id, dummy_url)
-    print(f"[INFO] Created {num_posts} pending social-post rows for article {article_id}.")
+    print(f"[INFO] Created {len(new_posts)} pending social-post rows for article {article_id}.")
 
     print("🎉 Simulation complete.")
 
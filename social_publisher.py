@@ -16,12 +16,17 @@ Example:
 import os
 import sys
 import time
+import atexit
+import queue
 import logging
+from logging.handlers import QueueHandler, QueueListener
 import argparse
 import schedule
 import re
-from datetime import datetime
-from typing import List, Optional, Dict, Any, Set, Tuple
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Dict, Any, Set, Tuple
 
 # Import the core functions
 from agent_tools import (
@@ -30,20 +35,28 @@ from agent_tools import (
     refresh_linkedin_token
 )
 from core.twitter_token import refresh_token_auto as refresh_twitter_token_auto
+from core.twitter_token import ensure_valid_token as ensure_twitter_token
+from core.linkedin_token import refresh_if_expiring as refresh_linkedin_if_expiring
 from core import global_cfg
 from core.credentials import users, user
-from Utils.google_drive import get_unpublished_filenames, update_social_post
+from Utils.google_drive import get_unpublished_filenames
 from dotenv import load_dotenv
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("social_publisher.log"),
-        logging.StreamHandler()
-    ]
-)
+# Configure logging. Log calls only enqueue the record; a QueueListener
+# thread does the file and console writes, so posting code never blocks on
+# log I/O. The listener is stopped (and drained) at exit.
+_log_handlers = [
+    logging.FileHandler("social_publisher.log"),
+    logging.StreamHandler()
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+_log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+logging.getLogger().setLevel(logging.INFO)
+logging.getLogger().addHandler(QueueHandler(_log_queue))
+_log_listener = QueueListener(_log_queue, *_log_handlers)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger("social_publisher")
 
 # Load environment variables and configuration
@@ -66,6 +79,10 @@ ALL_STEPS = {
 
 PLATFORMS = ["twitter", "linkedin", "all"]
 
+# In --schedule mode, tokens are renewed this many minutes before the daily
+# run so the run itself never waits on an OAuth round-trip.
+TOKEN_PREWARM_MIN = 10
+
 def set_debug_mode(enabled=True):
     """Enable or disable debug mode."""
     global DEBUG_MODE
@@ -97,37 +114,34 @@ def should_skip_step(step_name: str) -> bool:
     # Otherwise use the skip list
     return step_name in SKIP_STEPS
 
+# General auth error patterns, compiled once into a single alternation so a
+# check is one regex scan instead of a Python loop over the list.
+_AUTH_ERROR_RE = re.compile("|".join(f"(?:{p})" for p in (
+    r"401",
+    r"unauthorized",
+    r"auth.*fail",
+    r"invalid.*token",
+    r"expired.*token",
+    r"token.*expired",
+    r"authentication.*fail",
+    r"not.*authenticated",
+    r"auth.*error",
+    r"login.*required",
+    r"credentials.*invalid",
+)), re.IGNORECASE)
+
 def is_auth_error(error_message: str) -> bool:
     """Check if an error message indicates an authentication issue."""
     # Direct check for Twitter API 401 Unauthorized error
     if "401 Client Error: Unauthorized for url" in error_message:
         return True
-        
+
     # General auth error patterns as fallback
-    auth_error_patterns = [
-        r"401", 
-        r"unauthorized",
-        r"auth.*fail",
-        r"invalid.*token",
-        r"expired.*token",
-        r"token.*expired",
-        r"authentication.*fail",
-        r"not.*authenticated",
-        r"auth.*error",
-        r"login.*required",
-        r"credentials.*invalid"
-    ]
-    
-    error_lower = error_message.lower()
-    for pattern in auth_error_patterns:
-        if re.search(pattern, error_lower):
-            return True
-    
-    return False
+    return _AUTH_ERROR_RE.search(error_message) is not None
 
 def list_available_users():
     """List all available users from the credentials file."""
-    available_users = list(users().keys())
+    available_users = users()
     
     if not available_users:
         print("No users found in credentials file.")
@@ -135,8 +149,7 @@ def list_available_users():
     
     print("\nAvailable users:")
     print("----------------")
-    for i, user_id in enumerate(available_users, 1):
-        user_data = user(user_id)
+    for i, (user_id, user_data) in enumerate(available_users.items(), 1):
         platforms = []
         if 'twitter' in user_data:
             platforms.append("Twitter")
@@ -172,48 +185,67 @@ def set_active_user(user_id: str):
         logger.error(f"User '{user_id}' not found in credentials file.")
         return False
 
-def post_to_twitter_with_retry(user_id: Optional[str] = None, article_id: Optional[str] = None, filename: Optional[str] = None) -> Tuple[bool, Dict]:
+@dataclass(frozen=True)
+class PostResult:
+    """Normalised view of the dict returned by post_twitter / post_linkedin."""
+    published: List[Dict[str, Any]] = field(default_factory=list)
+    failed: List[Dict[str, Any]] = field(default_factory=list)
+    status: str = ""
+    error: str = ""
+    message: str = ""
+    logs: str = ""
+
+    @classmethod
+    def from_raw(cls, raw: Any) -> "PostResult":
+        if not isinstance(raw, dict):
+            return cls()
+        return cls(
+            published=raw.get("published") or [],
+            failed=raw.get("failed") or [],
+            status=str(raw.get("status") or ""),
+            error=str(raw.get("error") or ""),
+            message=str(raw.get("message") or ""),
+            logs=raw.get("logs") or "",
+        )
+
+    def error_details(self) -> str:
+        """Summarise why nothing was published, for log messages."""
+        if self.failed:
+            return " - Errors: " + ", ".join(f"{item.get('filename', '?')}: {item.get('error', 'Unknown error')}" for item in self.failed)
+        if self.error:
+            return f" - Error: {self.error}"
+        if self.message:
+            return f" - Message: {self.message}"
+        return ""
+
+def post_to_twitter_with_retry(user_id: Optional[str] = None, article_id: Optional[str] = None, filename: Optional[str] = None) -> Tuple[bool, PostResult]:
     """Post a single tweet to Twitter with automatic token refresh on auth failure."""
     logger.info(f"Posting to Twitter...")
     
-    # If user_id is provided, set it in the environment
-    if user_id:
-        os.environ["ACTIVE_USER"] = user_id
-    
     # First attempt to post
     error_details = ""
     try:
         print(f"posting for {user_id}")
-        result = post_twitter_func(user_id)
-        published = result.get("published", []) if isinstance(result, dict) else []
-        failed = result.get("failed", []) if isinstance(result, dict) else []
+        result = PostResult.from_raw(post_twitter_func(user_id))
         
         # Check if successful
-        if published:
-            if not failed:
-                logger.info(f"Posted {len(published)} tweet(s) successfully")
+        if result.published:
+            if not result.failed:
+                logger.info(f"Posted {len(result.published)} tweet(s) successfully")
             else:
-                logger.warning(f"Partial success: {len(published)} tweet(s) posted, {len(failed)} failed")
-                for item in failed:
+                logger.warning(f"Partial success: {len(result.published)} tweet(s) posted, {len(result.failed)} failed")
+                for item in result.failed:
                     logger.error(f"Tweet failed for file {item.get('filename', '?')}: {item.get('error')}")
             return True, result
         
         # No tweets published - log error details
-        error_details = ""
-        if isinstance(result, dict):
-            if result.get("failed") and len(result["failed"]) > 0:
-                error_details = " - Errors: " + ", ".join([f"{item.get('filename', '?')}: {item.get('error', 'Unknown error')}" for item in result["failed"]])
-            elif result.get("error"):
-                error_details = f" - Error: {result['error']}"
-            elif result.get("message"):
-                error_details = f" - Message: {result['message']}"
-        
+        error_details = result.error_details()
         logger.error(f"No tweets published{error_details}")
         
     except Exception as e:
         error_msg = str(e)
         logger.error(f"Error posting to Twitter: {error_msg}")
-        result = {"status": "error", "message": error_msg}
+        result = PostResult(status="error", message=error_msg)
     
     # If we got here, the first attempt failed - check if it's an auth error
 
@@ -221,79 +253,58 @@ def post_to_twitter_with_retry(user_id: Optional[str] = None, article_id: Option
         print("is_auth_error")
         logger.info("Detected authentication issue. Refreshing Twitter token...")
         try:
-            refresh_twitter_token_auto()
+            # Refresh the token of the user being posted for; if that fails
+            # the retry could only fail the same way, so stop here.
+            refreshed = refresh_twitter_token_auto(user_id) if user_id else refresh_twitter_token_auto()
+            if not refreshed:
+                logger.error("Failed to refresh Twitter token – not retrying")
+                return False, PostResult(status="error", message="Token refresh failed")
             logger.info("Twitter token refreshed. Retrying post...")
             
             # Second attempt after token refresh
-            retry_result = post_twitter_func(user_id)
-            published = retry_result.get("published", []) if isinstance(retry_result, dict) else []
-            failed = retry_result.get("failed", []) if isinstance(retry_result, dict) else []
+            retry_result = PostResult.from_raw(post_twitter_func(user_id))
             
-            if published:
-                if not failed:
-                    logger.info(f"Posted {len(published)} tweet(s) successfully after token refresh")
+            if retry_result.published:
+                if not retry_result.failed:
+                    logger.info(f"Posted {len(retry_result.published)} tweet(s) successfully after token refresh")
                 else:
-                    logger.warning(f"Partial success after token refresh: {len(published)} tweet(s) posted, {len(failed)} failed")
-                    for item in failed:
+                    logger.warning(f"Partial success after token refresh: {len(retry_result.published)} tweet(s) posted, {len(retry_result.failed)} failed")
+                    for item in retry_result.failed:
                         logger.error(f"Tweet failed for file {item.get('filename', '?')}: {item.get('error')}")
                 return True, retry_result
             
             # No tweets published on retry - log error
-            error_details = ""
-            if isinstance(retry_result, dict):
-                if retry_result.get("failed"):
-                    error_details = " - Errors: " + ", ".join([f"{item.get('filename', '?')}: {item.get('error', 'Unknown error')}" for item in retry_result["failed"]])
-                elif retry_result.get("error"):
-                    error_details = f" - Error: {retry_result['error']}"
-                elif retry_result.get("message"):
-                    error_details = f" - Message: {retry_result['message']}"
-            
-            logger.error(f"No tweets published after token refresh{error_details}")
+            logger.error(f"No tweets published after token refresh{retry_result.error_details()}")
             return False, retry_result
             
         except Exception as refresh_e:
             logger.error(f"Failed to refresh Twitter token: {refresh_e}")
-            return False, {"status": "error", "message": f"Token refresh failed: {str(refresh_e)}"}
+            return False, PostResult(status="error", message=f"Token refresh failed: {str(refresh_e)}")
     
     # Return the result of the first attempt
     return False, result
 
-def post_to_linkedin_with_retry(user_id: Optional[str] = None) -> Tuple[bool, Dict]:
+def post_to_linkedin_with_retry(user_id: Optional[str] = None) -> Tuple[bool, PostResult]:
     """Post to LinkedIn with automatic token refresh on auth failure."""
     logger.info("Posting to LinkedIn...")
     
-    # If user_id is provided, we need to set it in the environment
-    # so the underlying functions use the right credentials
-    if user_id:
-        os.environ["ACTIVE_USER"] = user_id
-    
     try:
-        result = post_linkedin_func(user_id)
-        published = result.get("published", []) if isinstance(result, dict) else []
-        failed    = result.get("failed", [])    if isinstance(result, dict) else []
-
-        if not published:
-            error_details = ""
-            if isinstance(result, dict):
-                if result.get("failed") and len(result["failed"]) > 0:
-                    error_details = " - Errors: " + ", ".join([f"{item.get('filename', '?')}: {item.get('error', 'Unknown error')}" for item in result["failed"]])
-                elif result.get("error"):
-                    error_details = f" - Error: {result['error']}"
-                elif result.get("message"):
-                    error_details = f" - Message: {result['message']}"
-            
-            logger.error(f"post_linkedin returned no published posts – treating as failure{error_details}")
-            raise Exception("no_posts_published")
-        if failed:
-            logger.warning(f"Partial success: {len(published)} LinkedIn post(s) published, {len(failed)} failed")
+        result = PostResult.from_raw(post_linkedin_func(user_id))
+
+        if not result.published:
+            logger.error(f"post_linkedin returned no published posts – treating as failure{result.error_details()}")
+            # Carry the reason along so an expired token reaches the auth handling below
+            raise Exception(f"no_posts_published{result.error_details()}")
+        if result.failed:
+            logger.warning(f"Partial success: {len(result.published)} LinkedIn post(s) published, {len(result.failed)} failed")
             # Log detailed errors
-            for item in failed:
+            for item in result.failed:
                 logger.error(f"LinkedIn post failed for file {item.get('filename', '?')}: {item.get('error')}")
         else:
-            logger.info(f"Posted {len(published)} LinkedIn post(s) successfully")
+            logger.info(f"Posted {len(result.published)} LinkedIn post(s) successfully")
         # Dump captured stdout logs at DEBUG level for troubleshooting
-        if result.get("logs"):
-            logger.debug("Detailed LinkedIn publish logs:\n" + result["logs"])
+        if result.logs:
+            logger.debug("Detailed LinkedIn publish logs:\n" + result.logs)
         return True, result
     except Exception as e:
         error_msg = str(e)
@@ -303,42 +314,86 @@ def post_to_linkedin_with_retry(user_id: Optional[str] = None) -> Tuple[bool, Di
         if is_auth_error(error_msg):
             logger.info("Detected LinkedIn authentication issue. Refreshing token...")
             try:
-                refresh_linkedin_token()
+                refresh_linkedin_token(user_id)
                 logger.info("LinkedIn token refreshed successfully. Retrying post...")
                 # Wait a moment for the token to be properly saved
                 time.sleep(3)
                 
                 # Retry the post
                 try:
-                    result = post_linkedin_func(user_id)
-                    published = result.get("published", []) if isinstance(result, dict) else []
-                    failed    = result.get("failed", [])    if isinstance(result, dict) else []
+                    result = PostResult.from_raw(post_linkedin_func(user_id))
 
-                    if not published:
+                    if not result.published:
                         logger.error("post_linkedin returned no published posts after refresh – failure")
                         raise Exception("no_posts_published")
-                    if failed:
-                        logger.warning(f"Partial success after refresh: {len(published)} LinkedIn post(s) published, {len(failed)} failed")
+                    if result.failed:
+                        logger.warning(f"Partial success after refresh: {len(result.published)} LinkedIn post(s) published, {len(result.failed)} failed")
                     else:
-                        logger.info(f"Posted {len(published)} LinkedIn post(s) successfully after token refresh")
+                        logger.info(f"Posted {len(result.published)} LinkedIn post(s) successfully after token refresh")
                     return True, result
                 except Exception as retry_e:
                     logger.error(f"Failed to post to LinkedIn even after token refresh: {retry_e}")
-                    return False, {"status": "error", "message": str(retry_e)}
+                    return False, PostResult(status="error", message=str(retry_e))
                     
             except Exception as refresh_e:
                 logger.error(f"Failed to refresh LinkedIn token: {refresh_e}")
-                return False, {"status": "error", "message": f"LinkedIn token refresh failed: {refresh_e}"}
+                return False, PostResult(status="error", message=f"LinkedIn token refresh failed: {refresh_e}")
         
-        return False, {"status": "error", "message": error_msg}
+        return False, PostResult(status="error", message=error_msg)
+
+@dataclass(frozen=True)
+class PlatformOps:
+    """What run_workflow needs to publish to one platform."""
+    name: str
+    label: str
+    step: str
+    post: Callable[[Optional[str]], Tuple[bool, PostResult]]
+
+# Platforms in the order run_workflow processes them
+PLATFORM_OPS: Dict[str, PlatformOps] = {
+    "twitter": PlatformOps("twitter", "Twitter", STEP_POST_TWITTER, post_to_twitter_with_retry),
+    "linkedin": PlatformOps("linkedin", "LinkedIn", STEP_POST_LINKEDIN, post_to_linkedin_with_retry),
+}
+
+def _process_platform(ops: PlatformOps, user_id: Optional[str], pending_posts: List[Dict[str, Any]]) -> None:
+    """Publish *pending_posts* for *user_id* on one platform and log the outcome per article."""
+    if not pending_posts:
+        logger.info(f"No pending {ops.label} posts found")
+        return
+
+    logger.info(f"Found {len(pending_posts)} pending {ops.label} posts")
+
+    # post_twitter / post_linkedin publish every pending post of the user
+    # concurrently and in one run, so a single call covers the whole list
+    # instead of one full run per post.
+    success, result = ops.post(user_id)
 
-def run_workflow(platform: str = "all", user_id: Optional[str] = None) -> bool:
+    if not success:
+        logger.error(f"Failed to post to {ops.label} for user {user_id}: {result.message}")
+        return
+
+    # The post_* run has already marked every published article in
+    # social_posts (posted + post_url) and uploaded the workbook once, so
+    # only the outcome per article is logged here.
+    published = {item.get("filename") for item in result.published}
+
+    for post in pending_posts:
+        article_id = post["article_id"]
+        if post["filename"] in published:
+            logger.info(f"Updated {ops.label} post status for article {article_id}")
+        else:
+            logger.error(f"Failed to post to {ops.label} for article {article_id} ({post['filename']})")
+
+def run_workflow(platform: str = "all", user_id: Optional[str] = None,
+                 pending_by_platform: Optional[Dict[str, List[Dict[str, Any]]]] = None) -> bool:
     """
     Run the social media publishing workflow.
     
     Args:
         platform: Platform to post to ("twitter", "linkedin", or "all")
         user_id: Optional user ID to use for credentials
+        pending_by_platform: Optional pending posts already fetched for this
+            user, keyed by platform; skips the lookup for those platforms
     
     Returns:
         bool: True if successful, False otherwise
@@ -348,98 +403,24 @@ def run_workflow(platform: str = "all", user_id: Optional[str] = None) -> bool:
         logger.info("STARTING SOCIAL MEDIA PUBLISHING WORKFLOW")
         logger.info("=" * 60)
         
-        # Set active user if provided
+        # Set active user if provided. This also exports ACTIVE_USER, which
+        # the post_* functions read, once for the whole workflow.
         if user_id:
             if not set_active_user(user_id):
                 return False
-            
-        # STEP 1: Post to Twitter
-        if (platform == "twitter" or platform == "all") and not should_skip_step(STEP_POST_TWITTER):
-            # Get pending Twitter posts for this user
-            pending_posts = get_unpublished_filenames("twitter", user_id)
-            
-            if not pending_posts:
-                logger.info("No pending Twitter posts found")
-            else:
-                logger.info(f"Found {len(pending_posts)} pending Twitter posts")
-                
-                for post in pending_posts:
-                    article_id = post["article_id"]
-                    filename = post["filename"]
-                    logger.info(f"Posting article {article_id} ({filename}) to Twitter")
-                    
-                    success, result = post_to_twitter_with_retry(user_id)
-                    
-                    if success:
-                        # Extract the Twitter URL
-                        post_url = ""
-                        if isinstance(result, dict):
-                            if "published" in result and result["published"] and len(result["published"]) > 0:
-                                post_url = result["published"][0].get("url", "")
-                        
-                        # Update the social media post record
-                        try:
-                            update_social_post(
-                                employee_name=user_id or "",  # Ensure non-None value
-                                platform="twitter",
-                                article_id=article_id,
-                                updates={
-                                    "posted": True,
-                                    "post_url": post_url
-                                }
-                            )
-                            logger.info(f"Updated Twitter post status for article {article_id}")
-                        except Exception as e:
-                            logger.error(f"Failed to update Twitter post status: {e}")
-                    else:
-                        error_message = result.get("message", "") if isinstance(result, dict) else ""
-                        logger.error(f"Failed to post to Twitter for article {article_id}: {error_message}")
-        elif should_skip_step(STEP_POST_TWITTER):
-            logger.info(f"SKIPPING: {STEP_POST_TWITTER}")
-            
-        # STEP 2: Post to LinkedIn
-        if (platform == "linkedin" or platform == "all") and not should_skip_step(STEP_POST_LINKEDIN):
-            # Get pending LinkedIn posts for this user
-            pending_posts = get_unpublished_filenames("linkedin", user_id)
-            
-            if not pending_posts:
-                logger.info("No pending LinkedIn posts found")
-            else:
-                logger.info(f"Found {len(pending_posts)} pending LinkedIn posts")
-                
-                for post in pending_posts:
-                    article_id = post["article_id"]
-                    filename = post["filename"]
-                    logger.info(f"Posting article {article_id} ({filename}) to LinkedIn")
-                    
-                    success, result = post_to_linkedin_with_retry(user_id)
-                    
-                    if success:
-                        # Extract the LinkedIn URL
-                        post_url = ""
-                        if isinstance(result, dict):
-                            if "published" in result and result["published"] and len(result["published"]) > 0:
-                                post_url = result["published"][0].get("url", "")
-                        
-                        # Update the social media post record
-                        try:
-                            update_social_post(
-                                employee_name=user_id or "",  # Ensure non-None value
-                                platform="linkedin",
-                                article_id=article_id,
-                                updates={
-                                    "posted": True,
-                                    "post_url": post_url
-                                }
-                            )
-                            logger.info(f"Updated LinkedIn post status for article {article_id}")
-                        except Exception as e:
-                            logger.error(f"Failed to update LinkedIn post status: {e}")
-                    else:
-                        error_message = result.get("message", "") if isinstance(result, dict) else ""
-                        logger.error(f"Failed to post to LinkedIn for article {article_id}: {error_message}")
-        elif should_skip_step(STEP_POST_LINKEDIN):
-            logger.info(f"SKIPPING: {STEP_POST_LINKEDIN}")
+
+        # One step per platform: Twitter first, then LinkedIn
+        for name, ops in PLATFORM_OPS.items():
+            skip = should_skip_step(ops.step)
+            if platform in (name, "all") and not skip:
+                # Get pending posts for this user
+                if pending_by_platform is not None and name in pending_by_platform:
+                    pending_posts = pending_by_platform[name]
+                else:
+                    pending_posts = get_unpublished_filenames(name, user_id)
+                _process_platform(ops, user_id, pending_posts)
+            elif skip:
+                logger.info(f"SKIPPING: {ops.step}")
         
         # Workflow completed successfully
         logger.info("=" * 60)
@@ -453,6 +434,26 @@ def run_workflow(platform: str = "all", user_id: Optional[str] = None) -> bool:
         logger.error(traceback.format_exc())
         return False
 
+def prewarm_tokens(platform: str = "all", user_id: Optional[str] = None):
+    """Renew every token that would expire before the upcoming scheduled run finishes.
+
+    Runs unattended, so only the silent refresh-token grants are used; a
+    token that cannot be renewed that way is left to the run's own handling.
+    """
+    # Anything expiring within the lead time plus a few minutes of run time
+    margin = (TOKEN_PREWARM_MIN + 5) * 60
+    targets = {user_id: user(user_id)} if user_id else users()
+    for uid, user_data in targets.items():
+        try:
+            if platform in ("twitter", "all") and "twitter" in user_data:
+                ensure_twitter_token(uid, margin=margin)
+            if platform in ("linkedin", "all") and "linkedin" in user_data:
+                if not refresh_linkedin_if_expiring(uid, margin=margin):
+                    logger.warning(f"LinkedIn token for {uid} cannot be renewed silently – sign-in needed")
+        except Exception as e:
+            # The run's own refresh-on-401 path still applies
+            logger.warning(f"Could not pre-refresh tokens for {uid}: {e}")
+
 def scheduled_run(platform: str = "all", user_id: Optional[str] = None):
     """Function to be called by the scheduler."""
     logger.info(f"Running scheduled workflow at {datetime.now().strftime('%H:%M:%S')}")
@@ -496,20 +497,24 @@ def main():
     
     # Helper: run for all pending pairs when --user not supplied
     def _run_all_pending():
-        pending_overall = get_unpublished_filenames()
+        # Only the requested platform's rows are selected (before the join
+        # with articles), and --platform is honoured here as well
+        pending_overall = get_unpublished_filenames(None if args.platform == "all" else args.platform)
         if not pending_overall:
             logger.info("No pending social posts found – nothing to do.")
             return True
 
-        pairs: Set[Tuple[str, str]] = set()
+        # Group the posts by (user, platform) in one pass; each workflow gets
+        # its share handed in instead of querying the workbook again.
+        pairs: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
         for entry in pending_overall:
-            pairs.add((entry["employee_name"], entry["platform"]))
+            pairs[(entry["employee_name"], entry["platform"])].append(entry)
 
-        logger.info(f"Will process {len(pairs)} (user, platform) pair(s): {pairs}")
+        logger.info(f"Will process {len(pairs)} (user, platform) pair(s): {set(pairs)}")
 
         overall_success = True
-        for user_id, platform in pairs:
-            ok = run_workflow(platform, user_id)
+        for (user_id, platform), posts in pairs.items():
+            ok = run_workflow(platform, user_id, pending_by_platform={platform: posts})
             overall_success = overall_success and ok
         return overall_success
 
@@ -531,11 +536,21 @@ def main():
                 
             logger.info(f"Scheduling workflow to run daily at {args.schedule}")
             schedule.every().day.at(args.schedule).do(scheduled_run, platform=args.platform, user_id=args.user)
+
+            # Token refresh runs as its own job ahead of the publishing run
+            prewarm_at = (datetime.strptime(args.schedule, "%H:%M")
+                          - timedelta(minutes=TOKEN_PREWARM_MIN)).strftime("%H:%M")
+            schedule.every().day.at(prewarm_at).do(prewarm_tokens, platform=args.platform, user_id=args.user)
             
             logger.info("Scheduler started. Press Ctrl+C to exit.")
+            # Sleep until the next job is due instead of polling every minute
             while True:
+                idle = schedule.idle_seconds()
+                if idle is None:
+                    break
+                if idle > 0:
+                    time.sleep(idle)
                 schedule.run_pending()
-                time.sleep(60)  # Check every minute
         except (ValueError, IndexError):
             logger.error("Invalid schedule time format. Use HH:MM (24-hour format)")
             sys.exit(1)
@@ -7,86 +7,175 @@ how the system automatically creates entries in the social_posts sheet
 when an article is marked as published on Medium.
 """
 
-import os
+import argparse
+import hashlib
+import numpy as np
 import pandas as pd
 import time
 import random
 from datetime import datetime
-from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload
-from googleapiclient.discovery import build
-from google.oauth2 import service_account
+from googleapiclient.errors import HttpError
 import io
 
-from core.credentials import global_cfg, google
-
-# Get configuration
-cfg = global_cfg()
-gcreds = google()
-DATABASE = cfg["blog_content_database"]
-EXCEL_NAME = cfg["excel_name"]
-EXCEL_PATH = os.path.join(DATABASE, EXCEL_NAME)
-
-# Google Drive setup
-SERVICE_ACCOUNT_FILE = gcreds["service_account_json"]
-DRIVE_SCOPE = [gcreds["drive_scope"]]
-FOLDER_ID = gcreds["drive_folder_id"]
-SHARED_DRIVE_ID = gcreds["shared_drive_id"]
-
-DRIVE_KWARGS = {"supportsAllDrives": True}
-LIST_KWARGS = {"supportsAllDrives": True, "includeItemsFromAllDrives": True}
-if SHARED_DRIVE_ID:
-    LIST_KWARGS.update({"driveId": SHARED_DRIVE_ID, "corpora": "drive"}) # type: ignore
-
-# Initialize Drive API client
-drive_creds = service_account.Credentials.from_service_account_file(
-    SERVICE_ACCOUNT_FILE,
-    scopes=DRIVE_SCOPE,
+# One Drive client for the whole process: the shared one from
+# Utils.google_drive, whose connection is kept alive across the calls below
+from Utils.google_drive import (
+    DRIVE_KWARGS,
+    EXCEL_NAME,
+    EXCEL_PATH,
+    EXCEL_READ_ENGINE,
+    FOLDER_ID,
+    SMALL_FILE_BYTES,
+    cached_excel_file_id,
+    drive,
+    find_first,
+    forget_excel_file_id,
+    get_media_bytes,
+    normalise_flag_columns,
+    remember_excel_file_id,
+    workbook_media,
 )
-drive = build("drive", "v3", credentials=drive_creds)
+
+# Declared column types, so parsing does not have to infer them per sheet.
+# Dates are kept as the YYYY-MM-DD text the sheets store; the flag columns
+# become nullable booleans through normalise_flag_columns.
+ARTICLES_DTYPES = {'id': 'Int64', 'filename': str, 'date': str, 'keyword': str, 'medium_url': str}
+SOCIAL_ACCOUNTS_DTYPES = {'id': 'Int64', 'employee_name': str, 'platform': str}
+SOCIAL_POSTS_DTYPES = {
+    'id': 'Int64', 'employee_name': str, 'platform': str,
+    'article_id': 'Int64', 'post_date': str, 'post_url': str,
+}
+
+# Metadata needed to decide whether, and how, to download the workbook
+WORKBOOK_FIELDS = "md5Checksum,size"
+
+def _resolve_file_id():
+    """Return the Excel file's Drive ID and, when it had to be looked up,
+    its md5Checksum/size metadata (None otherwise)."""
+    # Shares the persisted ID cache of Utils.google_drive, so the list call
+    # happens once rather than on every download
+    file_id = cached_excel_file_id()
+    if file_id:
+        return file_id, None
+
+    # The lookup also returns the checksum and size, which spares the
+    # download path its own metadata request
+    name = EXCEL_NAME.replace("'", "\\'")
+    query = f"name = '{name}' and '{FOLDER_ID}' in parents"
+    found = find_first(drive, query, fields=f"id,{WORKBOOK_FIELDS}")
+    if not found:
+        raise FileNotFoundError(f"Excel file not found on Drive: {EXCEL_NAME}")
+    remember_excel_file_id(found["id"])
+    return found["id"], found
+
+# file_id → (md5Checksum, raw xlsx bytes) of the last copy downloaded or
+# uploaded by this process. The same bytes are kept at EXCEL_PATH, so a
+# later run can skip the download as well.
+_XLSX_CACHE = {}
+
+def _read_local_copy(md5):
+    """Return the bytes saved at EXCEL_PATH if they match *md5*, else None."""
+    try:
+        with open(EXCEL_PATH, "rb") as fp:
+            raw = fp.read()
+    except OSError:
+        return None
+    return raw if hashlib.md5(raw).hexdigest() == md5 else None
+
+def _remember_workbook(file_id, md5, raw):
+    """Cache *raw* for this process and keep the local copy in step."""
+    _XLSX_CACHE[file_id] = (md5, raw)
+    try:
+        with open(EXCEL_PATH, "wb") as fp:
+            fp.write(raw)
+    except OSError as e:
+        print(f"[WARN] Could not save local Excel copy: {e}")
+
+def _fetch_workbook_bytes(file_id, meta=None):
+    """Return the workbook's bytes, skipping the download while Drive's
+    checksum still matches the cached copy."""
+    if meta is None:
+        meta = drive.files().get(fileId=file_id, fields=WORKBOOK_FIELDS, **DRIVE_KWARGS).execute()
+    md5 = meta.get("md5Checksum")
+    cached = _XLSX_CACHE.get(file_id)
+    if md5 and cached and cached[0] == md5:
+        return cached[1]
+
+    raw = _read_local_copy(md5) if md5 else None
+    if raw is not None:
+        _XLSX_CACHE[file_id] = (md5, raw)
+        return raw
+
+    # The workbook is a few KB: one GET rather than a next_chunk() loop,
+    # unless it has grown past SMALL_FILE_BYTES
+    size = int(meta.get("size") or 0)
+    raw = get_media_bytes(drive, file_id, small=size < SMALL_FILE_BYTES)
+    if md5:
+        _remember_workbook(file_id, md5, raw)
+    return raw
 
 def download_excel():
     """Download the Excel file and return the sheets."""
-    # Find Excel file
-    query = f"name = '{EXCEL_NAME}' and '{FOLDER_ID}' in parents"
-    res = drive.files().list(q=query, fields="files(id,name)", **LIST_KWARGS).execute()
-    files = res.get("files", [])
-    if not files:
-        raise FileNotFoundError(f"Excel file not found on Drive: {EXCEL_NAME}")
-    
-    file_id = files[0]["id"]
-    request = drive.files().get_media(fileId=file_id)
-    fh = io.BytesIO()
-    downloader = MediaIoBaseDownload(fh, request)
-    done = False
-    while not done:
-        status, done = downloader.next_chunk()
-    fh.seek(0)
-    
-    # Read all sheets
-    xl = pd.ExcelFile(fh)
-    sheet_names = xl.sheet_names
+    file_id, meta = _resolve_file_id()
+    try:
+        raw = _fetch_workbook_bytes(file_id, meta)
+    except HttpError as e:
+        if e.resp.status != 404:
+            raise
+        # Remembered ID went stale (file deleted / replaced) – look it up again
+        forget_excel_file_id()
+        file_id, meta = _resolve_file_id()
+        raw = _fetch_workbook_bytes(file_id, meta)
+    fh = io.BytesIO(raw)
     
+    # Open the workbook once and parse each sheet from it, with the fastest
+    # reader available (python-calamine when installed)
     result = {'file_id': file_id}
     
-    if 'articles' in sheet_names:
-        result['articles'] = pd.read_excel(fh, sheet_name='articles', dtype={'medium_url': str})
-    
-    if 'social_accounts' in sheet_names:
-        result['social_accounts'] = pd.read_excel(fh, sheet_name='social_accounts')
-    
-    if 'social_posts' in sheet_names:
-        result['social_posts'] = pd.read_excel(fh, sheet_name='social_posts', dtype={'post_url': str})
+    with pd.ExcelFile(fh, engine=EXCEL_READ_ENGINE) as xl:
+        sheet_names = xl.sheet_names
+        
+        if 'articles' in sheet_names:
+            result['articles'] = xl.parse('articles', dtype=ARTICLES_DTYPES)
+        
+        if 'social_accounts' in sheet_names:
+            result['social_accounts'] = xl.parse('social_accounts', dtype=SOCIAL_ACCOUNTS_DTYPES)
         
+        if 'social_posts' in sheet_names:
+            result['social_posts'] = xl.parse('social_posts', dtype=SOCIAL_POSTS_DTYPES)
+    
+    normalise_flag_columns(result)
     return result
 
-def add_test_article():
-    """Add a test article and return its ID."""
-    # Download current Excel
-    excel_data = download_excel()
-    file_id = excel_data['file_id']
+def upload_excel(file_id, sheets):
+    """Upload *sheets* over the Excel file on Drive.
+
+    The workbook is built in memory in openpyxl's write-only mode (see
+    Utils.google_drive.workbook_media) instead of through a local file.
+    Past SMALL_FILE_BYTES the media is resumable, and ``execute()`` sends
+    it chunk by chunk, retrying each chunk with exponential backoff.
+    """
+    media = workbook_media(sheets)
+    updated = drive.files().update(fileId=file_id, media_body=media, fields="md5Checksum", **DRIVE_KWARGS).execute(num_retries=3)
+
+    # What was just uploaded is what the next download would fetch
+    if updated.get("md5Checksum"):
+        _remember_workbook(file_id, updated["md5Checksum"], media.getbytes(0, media.size()))
+
+def _next_id(df):
+    """Return one past the largest id in *df*.
+
+    Ids are nullable Int64, so a sheet with only blank ids has an <NA>
+    maximum; that (like an empty or id-less sheet) counts as 0.
+    """
+    if 'id' not in df.columns:
+        return 1
+    last = df['id'].max(skipna=True)
+    return (0 if pd.isna(last) else int(last)) + 1
+
+def add_test_article(excel_data):
+    """Append a test article to *excel_data* in memory and return its ID and filename."""
     articles_df = excel_data['articles']
-    social_accounts_df = excel_data['social_accounts']
-    social_posts_df = excel_data['social_posts']
     
     # Create test article filename
     timestamp = int(time.time())
@@ -94,9 +183,7 @@ def add_test_article():
     print(f"Adding test article: {test_filename}")
     
     # Generate sequential ID
-    new_id = 1
-    if not articles_df.empty and 'id' in articles_df.columns and len(articles_df) > 0:
-        new_id = int(articles_df["id"].max() + 1)
+    new_id = _next_id(articles_df)
     
     # Create new article entry
     new_article = {
@@ -108,18 +195,9 @@ def add_test_article():
         'medium_url': ""
     }
     
-    # Add to dataframe
-    articles_df = pd.concat([articles_df, pd.DataFrame([new_article])], ignore_index=True)
-    
-    # Save all sheets
-    with pd.ExcelWriter(EXCEL_PATH, engine='openpyxl') as writer:
-        articles_df.to_excel(writer, sheet_name='articles', index=False)
-        social_accounts_df.to_excel(writer, sheet_name='social_accounts', index=False)
-        social_posts_df.to_excel(writer, sheet_name='social_posts', index=False)
-    
-    # Upload the updated file
-    media = MediaFileUpload(EXCEL_PATH, mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-    drive.files().update(fileId=file_id, media_body=media, **DRIVE_KWARGS).execute()
+    # Append in place: downloaded sheets carry a RangeIndex, so len() is the
+    # next free label and no copy of the whole sheet is made
+    articles_df.loc[len(articles_df)] = new_article
     
     return new_id, test_filename
 
@@ -137,31 +215,33 @@ def add_test_article():
 # print(articles_df.iloc[0])
 # print(social_accounts_df.iloc[0])
 # print(social_posts_df.iloc[0])
-def simulate_medium_publish(article_id, filename):
-    """Simulate publishing an article to Medium."""
-    # Download current Excel
-    excel_data = download_excel()
-    file_id = excel_data['file_id']
+def simulate_medium_publish(excel_data, article_id, filename, verbose=False):
+    """Mark *article_id* as published to Medium in *excel_data* and queue its
+    social posts, in memory. Returns the fake Medium URL, or None.
+
+    With *verbose*, the sheet columns and every created post are listed too.
+    """
     articles_df = excel_data['articles']
     social_accounts_df = excel_data['social_accounts']
     social_posts_df = excel_data['social_posts']
 
 
     # Find the article
-    article_mask = articles_df['id'] == article_id
+    article_mask = articles_df['id'].eq(article_id).fillna(False).astype(bool)
     if not article_mask.any():
         print(f"❌ Error: Article with ID {article_id} not found!")
-        return False
+        return None
     
     # Generate a fake Medium URL
-    medium_url = f"https://medium.com/@test-user/{filename.replace('_', '-').replace('.md', '')}-{random.randint(1000, 9999)}"
+    medium_url = f"https://medium.com/@test-user/{filename.removesuffix('.md').replace('_', '-')}-{random.randint(1000, 9999)}"
     
     # Count social accounts before update
     print(f"\nBefore Medium publish:")
     print(f"  - Number of social accounts: {len(social_accounts_df)}")
     print(f"  - Number of social posts: {len(social_posts_df)}")
-    print(f"  - Social account columns: {list(social_accounts_df.columns)}")
-    print(f"  - Social posts columns: {list(social_posts_df.columns)}")
+    if verbose:
+        print(f"  - Social account columns: {list(social_accounts_df.columns)}")
+        print(f"  - Social posts columns: {list(social_posts_df.columns)}")
     
     # Update the article to mark as published
     articles_df.loc[article_mask, 'posted_medium'] = True
@@ -169,47 +249,28 @@ def simulate_medium_publish(article_id, filename):
     articles_df.loc[article_mask, 'date'] = datetime.now().strftime("%Y-%m-%d")
     
     # Get the next available ID for social posts
-    next_id = 1
-    if not social_posts_df.empty and 'id' in social_posts_df.columns and len(social_posts_df) > 0:
-        next_id = int(social_posts_df['id'].max()) + 1 if len(social_posts_df) > 0 else 1
-    
-    # For each social account, create a pending post
-    new_posts = []
-    for _, account in social_accounts_df.iterrows():
-        new_posts.append({
-            'id': next_id,
-            'employee_name': account['employee_name'],
-            'platform': account['platform'],
-            'article_id': article_id,
-            'posted': False,
-            'post_date': '',
-            'post_url': ''
-        })
-        next_id += 1
-    
-    # Add new posts to dataframe
-    if new_posts:
-        social_posts_df = pd.concat([social_posts_df, pd.DataFrame(new_posts)], ignore_index=True)
+    next_id = _next_id(social_posts_df)
     
-    # Save all sheets
-    with pd.ExcelWriter(EXCEL_PATH, engine='openpyxl') as writer:
-        articles_df.to_excel(writer, sheet_name='articles', index=False)
-        social_accounts_df.to_excel(writer, sheet_name='social_accounts', index=False)
-        social_posts_df.to_excel(writer, sheet_name='social_posts', index=False)
+    # One pending post per social account, built column-wise (as in
+    # core.medium.build_social_posts) rather than row by row
+    n = len(social_accounts_df)
+    new_posts_df = pd.DataFrame({
+        'id': np.arange(next_id, next_id + n, dtype=np.int64),
+        'employee_name': social_accounts_df['employee_name'].to_numpy(),
+        'platform': social_accounts_df['platform'].to_numpy(),
+        'article_id': article_id,
+        'posted': False,
+        'post_date': '',
+        'post_url': ''
+    })
     
-    # Upload the updated file
-    media = MediaFileUpload(EXCEL_PATH, mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-    drive.files().update(fileId=file_id, media_body=media, **DRIVE_KWARGS).execute()
-    
-    print(f"\n✅ Successfully simulated publishing to Medium:")
-    print(f"  - URL: {medium_url}")
-    
-    # Download again to verify
-    excel_data = download_excel()
-    social_posts_df = excel_data['social_posts']
+    # Add new posts to dataframe
+    if n:
+        social_posts_df = pd.concat([social_posts_df, new_posts_df], ignore_index=True)
+        excel_data['social_posts'] = social_posts_df
     
     # Count social posts after update
-    article_posts = social_posts_df[social_posts_df['article_id'] == article_id]
+    article_posts = social_posts_df[social_posts_df['article_id'].eq(article_id).fillna(False).astype(bool)]
     
     print(f"\nAfter Medium publish:")
     print(f"  - Number of social accounts: {len(social_accounts_df)}")
@@ -217,24 +278,48 @@ def simulate_medium_publish(article_id, filename):
     print(f"  - Number of posts for this article: {len(article_posts)}")
     
     # Print details of the social posts for this article
-    if not article_posts.empty:
+    if verbose and not article_posts.empty:
         print("\nSocial posts created for this article:")
-        for idx, post in article_posts.iterrows():
-            print(f"  - Post ID: {post['id']}")
-            print(f"    Platform: {post['platform']}")
-            print(f"    Employee: {post['employee_name']}")
-            print(f"    Posted: {post['posted']}")
+        for post in article_posts.itertuples(index=False):
+            print(f"  - Post ID: {post.id}")
+            print(f"    Platform: {post.platform}")
+            print(f"    Employee: {post.employee_name}")
+            print(f"    Posted: {post.posted}")
             print()
     
-    return True
+    return medium_url
 
-def main():
+def add_and_publish(verbose=False):
+    """Add a test article and simulate its Medium publish as one
+    download → mutate → upload round-trip."""
+    excel_data = download_excel()
+    
     # Add a test article
-    article_id, filename = add_test_article()
+    article_id, filename = add_test_article(excel_data)
     print(f"Added article with ID: {article_id}")
     
     # Simulate publishing to Medium
-    simulate_medium_publish(article_id, filename)
+    medium_url = simulate_medium_publish(excel_data, article_id, filename, verbose)
+    if medium_url is None:
+        return False
+    
+    # Save all sheets and upload the updated file
+    upload_excel(excel_data['file_id'], {
+        'articles': excel_data['articles'],
+        'social_accounts': excel_data['social_accounts'],
+        'social_posts': excel_data['social_posts'],
+    })
+    
+    print(f"\n✅ Successfully simulated publishing to Medium:")
+    print(f"  - URL: {medium_url}")
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate a Medium publish against the tracking Excel")
+    parser.add_argument("--verbose", action="store_true", help="List sheet columns and every created social post")
+    args = parser.parse_args()
+    
+    add_and_publish(args.verbose)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file